@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Standalone benchmarks for bootstrap_templatetags, run against the demo test settings.
+
+    python benchmarks/run.py                       # every case, both styles
+    python benchmarks/run.py -k accordion-100      # cases whose name contains a substring
+    python benchmarks/run.py --save baseline.json  # store the results
+    python benchmarks/run.py --compare baseline.json --threshold 0.2
+
+Each case is named ``<operation>-<tag>-<size>-<style>-<loader>``:
+
+* operation: ``compile`` (``Engine.from_string()`` on the template's source) or ``render``
+  (rendering a fetched template)
+* tag: ``accordion``, ``navtabs``, ``nested`` (an accordion with a navtabs in every panel),
+  ``deep`` (accordions and navtabs nested in turn around a 10 KB body), or ``io`` and ``ioparallel``
+  (an accordion whose panel bodies each wait 5 ms as if on a query, rendered one after the other or
+  with ``parallel`` set to the number of panels), ``modal``, ``carousel``, ``dropdown`` or
+  ``listgroup``
+* size: the number of panels/tabs/slides/items, the number of modals for ``modal``, or the nesting
+  depth for ``deep``
+* style: ``bootstrap2``, ``bootstrap3``, ``bootstrap4`` or ``bootstrap5``
+* loader: ``cached`` or ``uncached`` template loader; ``compile`` never goes through the template
+  loaders, so it only has ``uncached`` cases
+
+For every case the best time of several runs is reported as ops/sec, together with the peak
+memory traced while running the operation once.  With ``--compare``, the run fails if any case's
+ops/sec is more than ``--threshold`` (a fraction) below the stored baseline.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ["compile", "render"]
+TAGS = [
+    "accordion",
+    "navtabs",
+    "nested",
+    "deep",
+    "io",
+    "ioparallel",
+    "modal",
+    "carousel",
+    "dropdown",
+    "listgroup",
+]
+SIZES = {
+    "accordion": [1, 10, 100, 1000],
+    "navtabs": [1, 10, 100, 1000],
+    "nested": [1, 10, 100, 1000],
+    "deep": [1, 5, 20],
+    "io": [1, 10],
+    "ioparallel": [1, 10],
+    "modal": [1, 10, 100],
+    "carousel": [1, 10, 100, 1000],
+    "dropdown": [1, 10, 100, 1000],
+    "listgroup": [1, 10, 100, 1000],
+}
+STYLES = ["bootstrap2", "bootstrap3", "bootstrap4", "bootstrap5"]
+LOADERS = ["cached", "uncached"]
+
+
+class IO(object):
+    """Stands in for an I/O-bound value, e.g. an unevaluated queryset, in the ``io`` cases."""
+
+    delay = 0.005
+
+    def __str__(self):
+        time.sleep(self.delay)
+        return "io"
+
+
+def setup_django():
+    sys.path[:0] = [ROOT, os.path.join(ROOT, "demo")]
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "demo.settings_test")
+
+    import django
+
+    django.setup()
+
+
+def accordion_source(panels, body="Panel {{ title }} content", options=""):
+    panel = '{%% panel heading="Heading %d" %%}'
+    return (
+        '{%% bootstrap_accordion id="accordion"%s %%}' % options
+        + "".join(panel % i + body for i in range(panels))
+        + "{% endbootstrap_accordion %}"
+    )
+
+
+def navtabs_source(tabs, body="Tab {{ title }} content"):
+    tab = '{%% tab label="Tab %d" %%}'
+    return (
+        "{% bootstrap_navtabs %}"
+        + "".join(tab % i + body for i in range(tabs))
+        + "{% endbootstrap_navtabs %}"
+    )
+
+
+def deep_source(depth):
+    """Nests a one-panel accordion or navtabs ``depth`` times, in turn, around a large body."""
+    source = "{{ title }} " + "x" * 10240
+    for level in range(depth):
+        if level % 2:
+            source = navtabs_source(1, body=source)
+        else:
+            source = accordion_source(1, body=source).replace('"accordion"', '"a%d"' % level)
+    return source
+
+
+def modal_source(modals):
+    modal = (
+        '{%% bootstrap_modal id="modal%d" title="Modal {{ title }}" %%}Body {{ title }}'
+        '{%% footer %%}<button class="btn">OK</button>{%% endbootstrap_modal %%}'
+    )
+    return "".join(modal % i for i in range(modals))
+
+
+def items_source(tag, section, items, body="Item {{ title }}"):
+    """A ``tag`` with ``items`` of its ``section`` pieces, e.g. the slides of a carousel."""
+    return (
+        "{%% %s %%}" % tag
+        + "".join("{%% %s %%}" % section + body for _ in range(items))
+        + "{%% end%s %%}" % tag.split()[0]
+    )
+
+
+def sources():
+    """Returns the benchmark templates, by name."""
+    templates = {}
+    for size in SIZES["accordion"]:
+        templates["accordion-%d" % size] = accordion_source(size)
+    for size in SIZES["navtabs"]:
+        templates["navtabs-%d" % size] = navtabs_source(size)
+    for size in SIZES["nested"]:
+        templates["nested-%d" % size] = accordion_source(size, body=navtabs_source(3))
+    for size in SIZES["deep"]:
+        templates["deep-%d" % size] = deep_source(size)
+    for size in SIZES["io"]:
+        templates["io-%d" % size] = accordion_source(size, body="{{ io }}")
+    for size in SIZES["ioparallel"]:
+        templates["ioparallel-%d" % size] = accordion_source(
+            size, body="{{ io }}", options=" parallel=%d" % size
+        )
+    for size in SIZES["modal"]:
+        templates["modal-%d" % size] = modal_source(size)
+    for size in SIZES["carousel"]:
+        templates["carousel-%d" % size] = items_source(
+            'bootstrap_carousel id="carousel"', 'slide caption="Slide"', size
+        )
+    for size in SIZES["dropdown"]:
+        templates["dropdown-%d" % size] = items_source(
+            'bootstrap_dropdown label="Menu"', 'item href="/item"', size
+        )
+    for size in SIZES["listgroup"]:
+        templates["listgroup-%d" % size] = items_source(
+            "bootstrap_listgroup", 'item href="/item" badge=1', size
+        )
+    return {name: "{% load bootstrap_tags %}" + source for name, source in templates.items()}
+
+
+def templates_setting(cached):
+    loaders = [
+        ("django.template.loaders.locmem.Loader", sources()),
+        "django.template.loaders.app_directories.Loader",
+    ]
+    if cached:
+        loaders = [("django.template.loaders.cached.Loader", loaders)]
+    return [
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "APP_DIRS": False,
+            "OPTIONS": {"loaders": loaders},
+        }
+    ]
+
+
+def cases(style):
+    for operation in OPERATIONS:
+        for tag in TAGS:
+            for size in SIZES[tag]:
+                for loader in LOADERS:
+                    if operation == "compile" and loader == "cached":
+                        continue
+                    yield "-".join([operation, tag, str(size), style, loader])
+
+
+def measure(name, repeat):
+    """Times a case, returning its ops/sec and the peak memory of a single operation."""
+    from django.template import engines
+    from django.test.utils import override_settings
+
+    operation, tag, size, style, loader = name.split("-")
+    template_name = "{}-{}".format(tag, size)
+
+    with override_settings(TEMPLATES=templates_setting(loader == "cached")):
+        engine = engines["django"]
+        if operation == "compile":
+            source = sources()[template_name]
+            engine.from_string(source)  # Warm up the fragments
+
+            def function():
+                engine.from_string(source)
+
+        else:
+            template = engine.get_template(template_name)
+            context = {"title": "benchmark", "bootstrap_style": style, "io": IO()}
+
+            def function():
+                template.render(context)
+
+        function()
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"ops": 1 / best, "seconds": best, "peak_kb": peak / 1024}
+
+
+def run(styles, keyword, repeat):
+    results = {}
+    for style in styles:
+        for name in cases(style):
+            if keyword and keyword not in name:
+                continue
+            results[name] = measure(name, repeat)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns the names of the cases that regressed beyond ``threshold`` against ``baseline``."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        ratio = result["ops"] / baseline[name]["ops"]
+        if ratio < 1 - threshold:
+            regressions.append(name)
+        print("{:<45} {:>7.1%} of baseline".format(name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", "--keyword", help="Only run cases whose name contains this")
+    parser.add_argument("--style", choices=STYLES, help="Only run cases for one style")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per case")
+    parser.add_argument("--save", metavar="JSON", help="Write the results to a JSON file")
+    parser.add_argument("--compare", metavar="JSON", help="Compare against a stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown")
+    options = parser.parse_args(argv)
+
+    setup_django()
+    styles = [options.style] if options.style else STYLES
+    results = run(styles, options.keyword, options.repeat)
+
+    for name, result in results.items():
+        print(
+            "{name:<45} {ops:>12.1f} ops/sec  {peak_kb:>10.1f} KiB peak".format(name=name, **result)
+        )
+
+    if options.save:
+        with open(options.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print("Regressed beyond {:.0%}: {}".format(options.threshold, ", ".join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
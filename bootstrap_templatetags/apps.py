@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class BootstrapTemplateTagsConfig(AppConfig):
+    name = "bootstrap_templatetags"
+
+    def ready(self):
+        from .styles import styles
+
+        # Register the style packs of the installed apps before any template is rendered
+        styles.autodiscover()
+
+        # Compile the fragments and the templates using the tags before the first request
+        warmup_styles = getattr(settings, "BOOTSTRAP_TEMPLATETAGS_WARMUP", False)
+        if warmup_styles:
+            from .warmup import warmup
+
+            if warmup_styles is True:
+                warmup()
+            else:
+                warmup(styles=warmup_styles)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db.models import Model
+from django.dispatch import receiver
+from django.utils.functional import Promise
+from django.utils.safestring import mark_safe
+
+DEFAULT_LRU_SIZE = 128
+
+
+class LocalCache(object):
+    """
+    Small in-process LRU cache in front of the cache backend, so that hot fragments don't pay for a
+    backend round trip.  Its size is ``settings.BOOTSTRAP_TEMPLATETAGS_CACHE_LRU_SIZE``.
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self):
+        return getattr(settings, "BOOTSTRAP_TEMPLATETAGS_CACHE_LRU_SIZE", DEFAULT_LRU_SIZE)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        maxsize = self.maxsize
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+local_cache = LocalCache()
+
+
+def get_backend():
+    return caches[getattr(settings, "BOOTSTRAP_TEMPLATETAGS_CACHE_ALIAS", "default")]
+
+
+def normalize_part(part):
+    """
+    Returns ``part`` in the form it is pickled in for a cache key: strings (including lazy ones,
+    in the active language) as plain strings, saved model instances as their model and primary key,
+    and lists, tuples and dicts with their items normalized.
+    """
+    if isinstance(part, Promise):
+        part = str(part)
+    if isinstance(part, str):
+        # Also a plain str for subclasses such as SafeString, whose own __str__ returns themselves
+        return str.__str__(part)
+    if isinstance(part, Model) and part.pk is not None:
+        return ("model", part._meta.label, part.pk)
+    if isinstance(part, (list, tuple)):
+        return tuple(normalize_part(item) for item in part)
+    if isinstance(part, dict):
+        return {normalize_part(key): normalize_part(value) for key, value in part.items()}
+    return part
+
+
+def encode_part(part):
+    """
+    Returns ``part`` as bytes that no other value encodes to, length-prefixed so that the encoded
+    parts cannot run into each other.  Raises a ValueError for values that cannot be pickled.
+    """
+    try:
+        data = pickle.dumps(normalize_part(part), protocol=4)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise ValueError("Cannot use %r in a cache key: %s" % (part, e))
+    return len(data).to_bytes(8, "big") + data
+
+
+def make_key(name, parts):
+    """Builds the cache key for a tag's output from its name and the values it varies on."""
+    digest = hashlib.md5(usedforsecurity=False)
+    for part in parts:
+        digest.update(encode_part(part))
+    return "bootstrap_templatetags.{name}.{digest}".format(name=name, digest=digest.hexdigest())
+
+
+def get_or_render(key, timeout, render):
+    """
+    Returns the cached output for ``key``, checking the local LRU tier before the cache backend.
+    On a miss, ``render()`` is called and its output stored in both tiers for ``timeout`` seconds.
+    """
+    content = local_cache.get(key)
+    if content is not None:
+        return mark_safe(content)
+
+    backend = get_backend()
+    content = backend.get(key)
+    if content is None:
+        content = str(render())
+        backend.set(key, content, timeout)
+    local_cache.set(key, content, timeout)
+    return mark_safe(content)
+
+
+@receiver(setting_changed)
+def clear_local_cache(setting, **kwargs):
+    if setting in ("CACHES", "BOOTSTRAP_TEMPLATETAGS_CACHE_ALIAS"):
+        local_cache.clear()
@@ -0,0 +1,653 @@
+# -*- coding: utf-8 -*-
+"""
+Python API for the Bootstrap components, rendering directly from the fragment templates without
+any template parsing.  The template tags are thin wrappers over these builders::
+
+    accordion = Accordion(id="faq", active_panel=2)
+    accordion.panel("First", "Escaped text")
+    accordion.panel("Second", mark_safe("<p>Trusted HTML</p>"))
+    html = accordion.render()
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.forms.utils import flatatt
+from django.template import Context, Variable
+from django.template.context import make_context
+from django.template.defaultfilters import slugify
+from django.template.loader import get_template
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from .fragments import fragments
+from .instrumentation import timed
+from .segments import Segments
+from .styles import (
+    ACCORDION_PANEL_STYLE,
+    ACCORDION_STYLE,
+    ACCORDION_USE_TITLE,
+    LISTGROUP_ITEM_STYLE,
+    MODAL_SIZE,
+    check_capabilities,
+    styles,
+)
+
+SLOT_MARKER = mark_safe("<!--bootstrap_templatetags:slot-->")
+
+# Valid values of the accordion's ``use_title`` option
+TITLE_ELEMENTS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+# Context variable that selects the style for the tags in a template, e.g. from a context processor
+STYLE_CONTEXT_VARIABLE = "bootstrap_style"
+
+
+def get_default_style():
+    style = getattr(settings, "BOOTSTRAP_TEMPLATETAGS_STYLE", None)
+    if not style:
+        raise ImproperlyConfigured(
+            "settings.BOOTSTRAP_TEMPLATETAGS_STYLE is unset; please use one of %s."
+            % ", ".join(repr(name) for name in styles.names())
+        )
+    return style
+
+
+def stop_unsupported_use(tag, style, required_values, current_style=None):
+    """
+    Raises a ValueError if the style being rendered (``current_style``, by default
+    settings.BOOTSTRAP_TEMPLATETAGS_STYLE) is set inappropriately for the use of values in the
+    ``required_values`` list, which is a list of 2-tuples of user-defined values paired to the
+    required untampered value.
+
+    Kept for third-party tags; the shipped tags check the style pack's capabilities instead (see
+    ``styles.check_capabilities``).
+    """
+    if (current_style or get_default_style()) == style:
+        for arg, default_value in required_values:
+            if arg != default_value:
+                raise ValueError("%s's '%s' option not available for %s" % (tag.name, arg, style))
+
+
+def check_use_title(tag, use_title):
+    """Raises a ValueError unless ``use_title`` is False or the name of a heading element."""
+    if use_title and use_title not in TITLE_ELEMENTS:
+        raise ValueError(
+            "%s's 'use_title' option must be one of %s, not %r"
+            % (tag.name, ", ".join(TITLE_ELEMENTS), use_title)
+        )
+
+
+def render_fragment(sender, version, template_name, context):
+    """
+    Renders the fragment ``template_name`` for the ``version`` style (by default, the style in
+    settings).  The template itself is resolved only once per process and style through the
+    fragment registry.
+    """
+    fragment = fragments.get(version or get_default_style(), template_name)
+    with timed(sender, "fragment", fragment.name):
+        return mark_safe(fragment.render(context))
+
+
+def get_body_template(body_template):
+    """Accepts a template name or an already loaded template, returning the engine Template."""
+    if isinstance(body_template, str):
+        body_template = get_template(body_template)
+    return getattr(body_template, "template", body_template)
+
+
+def get_context(context=None, request=None, style_version=None):
+    """Returns ``context`` as a ``Context``, building one from a dict (and ``request``) if needed."""
+    if not isinstance(context, Context):
+        context = make_context(context, request)
+        if style_version:
+            context[STYLE_CONTEXT_VARIABLE] = style_version
+    return context
+
+
+def render_item_body(context, item, item_name, template=None, attr=None):
+    """
+    Renders the body for one ``item`` of a data-driven component: either the compiled
+    ``template``, rendered with ``item_name`` pushed onto the context, or the item's ``attr``
+    lookup.
+    """
+    if template is not None:
+        with context.push({item_name: item}):
+            return template.render(context)
+    if attr is not None:
+        return conditional_escape(Variable(attr).resolve(item))
+    return ""
+
+
+def escape_body(body):
+    """Escapes a builder's ``body`` argument unless it is marked safe or already ``Segments``."""
+    if isinstance(body, Segments):
+        return body
+    return conditional_escape(body)
+
+
+class Component(object):
+    """
+    Base class of the builders, rendering their ``templates`` fragments for one style.
+
+    ``style_version`` defaults to settings.BOOTSTRAP_TEMPLATETAGS_STYLE.  ``templates`` replaces
+    the class's fragment names and ``sender`` the class reported to ``render_timing``; the tags use
+    both to render as themselves.  ``renderer`` replaces ``render_fragment()``, taking the same
+    arguments, e.g. to render the fragments with another template engine.
+
+    Each builder renders its whole output as ``Segments`` from ``render_segments()``.
+    """
+
+    name = None
+    templates = {}
+
+    def __init__(self, style_version=None, templates=None, sender=None, renderer=None):
+        self.version = style_version or get_default_style()
+        if templates is not None:
+            self.templates = templates
+        self.sender = sender or self.__class__
+        self.renderer = renderer or render_fragment
+
+    def render_template(self, name, **context):
+        return self.renderer(self.sender, self.version, self.templates[name], context)
+
+    def render_template_parts(self, name, slot, **context):
+        """
+        Renders the ``name`` fragment around a placeholder for its ``slot`` variable and returns the
+        (head, tail) markup on either side of it, so that the slot's content can be emitted in
+        between without being copied into the fragment.  Returns None unless the template outputs
+        the slot exactly once, unfiltered and unconditionally (see ``Fragment.has_plain_slot``).
+        """
+        if not fragments.get(self.version, self.templates[name]).has_plain_slot(slot):
+            return None
+        context[slot] = SLOT_MARKER
+        content = self.render_template(name, **context)
+        if content.count(SLOT_MARKER) != 1:
+            return None
+        head, tail = content.split(SLOT_MARKER)
+        return mark_safe(head), mark_safe(tail)
+
+    def render_template_segments(self, name, slot, content, **context):
+        """
+        Renders the ``name`` fragment with ``content`` (a string or ``Segments``) in its ``slot``
+        variable, returning ``Segments`` that hold ``content`` by reference.
+        """
+        parts = self.render_template_parts(name, slot, **context)
+        if parts is None:
+            context[slot] = Segments().add(content).flatten()
+            return Segments([self.render_template(name, **context)])
+        head, tail = parts
+        return Segments([head]).add(content).add(tail)
+
+    def render(self):
+        return self.render_segments().flatten()
+
+    def __str__(self):
+        return self.render()
+
+    def __html__(self):
+        return self.render()
+
+
+class Accordion(Component):
+    """
+    Builds an accordion, one ``panel()`` at a time.  The arguments are those of
+    ``{% bootstrap_accordion %}``: ``active_panel`` is the 1-based index of the expanded panel, and
+    ``style`` and ``use_title`` are not available for Bootstrap 2.
+    """
+
+    name = "bootstrap_accordion"
+    templates = {
+        "wrapper": "accordion/wrapper.html",
+        "heading": "accordion/heading.html",
+        "body": "accordion/body.html",
+        "panel": "accordion/panel.html",
+        "lazy": "lazy.html",
+    }
+
+    def __init__(self, id, active_panel=1, style="default", use_title=False, **kwargs):
+        super(Accordion, self).__init__(**kwargs)
+        check_use_title(self, use_title)
+        check_capabilities(
+            self,
+            self.version,
+            [(ACCORDION_STYLE, style, "default"), (ACCORDION_USE_TITLE, use_title, False)],
+        )
+        self.id = id
+        self.active_panel = active_panel
+        self.style = style
+        self.use_title = use_title
+        self.counter = 0
+        self.panels = Segments()
+
+    @classmethod
+    def from_items(
+        cls,
+        items,
+        id,
+        heading_attr="heading",
+        body_template=None,
+        body_attr=None,
+        item_name="item",
+        context=None,
+        request=None,
+        **kwargs,
+    ):
+        """
+        Returns an accordion with a panel for each of ``items``, as ``{% bootstrap_accordion_from %}``
+        does.  ``context`` (a dict or ``Context``) is available to the body template.
+        """
+        context = get_context(context, request, kwargs.get("style_version"))
+        kwargs["style_version"] = kwargs.get("style_version") or context.get(STYLE_CONTEXT_VARIABLE)
+        accordion = cls(id, **kwargs)
+        heading = Variable(heading_attr)
+        template = get_body_template(body_template) if body_template else None
+        for item in items:
+            body = render_item_body(context, item, item_name, template, body_attr)
+            accordion.panel(heading.resolve(item), body)
+        return accordion
+
+    def panel(self, heading, body, style=None):
+        """Adds a panel; ``body`` is escaped unless marked safe.  Returns the accordion."""
+        i, active = self.next_panel(style)
+        self.panels.add(self.render_panel(i, active, heading, escape_body(body), style))
+        return self
+
+    def next_panel(self, style=None):
+        """Counts a new panel, returning its index and its active class."""
+        check_capabilities(self, self.version, [(ACCORDION_PANEL_STYLE, style, None)])
+        self.counter += 1
+        return self.counter, "in" if self.counter == self.active_panel else ""
+
+    def render_panel(self, i, active, heading, body, style=None):
+        """
+        Renders a single panel from its heading and rendered body (a string or ``Segments``),
+        returning ``Segments``.
+        """
+        data = {
+            "id": self.id,
+            "i": i,
+            "active": active,
+            "heading": heading,
+            "use_title": self.use_title,
+        }
+        panel_heading = self.render_template("heading", **data)
+        panel_body = self.render_template_segments("body", "body", body, **data)
+        return self.render_template_segments(
+            "panel",
+            "panel_body",
+            panel_body,
+            panel_heading=panel_heading,
+            style=style or self.style,
+            **data,
+        )
+
+    def render_wrapper(self, content):
+        return self.render_template_segments("wrapper", "content", content, id=self.id)
+
+    def render_segments(self):
+        return self.render_wrapper(self.panels)
+
+
+class Tab(object):
+    """What ``NavTabs`` keeps of an added tab until its content panel is rendered."""
+
+    __slots__ = ("tab_id", "active", "show", "body")
+
+    def __init__(self, tab_id, active, show, body):
+        self.tab_id = tab_id
+        self.active = active
+        self.show = show
+        self.body = body
+
+
+class NavTabs(Component):
+    """
+    Builds nav-tabs, one ``tab()`` at a time.  ``active_tab`` is the 1-based index of the tab shown
+    first; if that tab is hidden, the next one is shown instead.
+    """
+
+    name = "bootstrap_navtabs"
+    templates = {
+        "wrapper": "navtabs/wrapper.html",
+        "tab": "navtabs/tab.html",
+        "panels_wrapper": "navtabs/panels_wrapper.html",
+        "panel": "navtabs/panel.html",
+        "lazy": "lazy.html",
+    }
+
+    def __init__(self, active_tab=1, **kwargs):
+        super(NavTabs, self).__init__(**kwargs)
+        self.active_index = active_tab
+        self.counter = 0
+        self.tabs = []
+        self.strip = Segments()
+
+    @classmethod
+    def from_items(
+        cls,
+        items,
+        label_attr="label",
+        body_template=None,
+        body_attr=None,
+        id_attr=None,
+        item_name="item",
+        context=None,
+        request=None,
+        **kwargs,
+    ):
+        """
+        Returns nav-tabs with a tab for each of ``items``, as ``{% bootstrap_navtabs_from %}``
+        does.  ``context`` (a dict or ``Context``) is available to the body template.
+        """
+        context = get_context(context, request, kwargs.get("style_version"))
+        kwargs["style_version"] = kwargs.get("style_version") or context.get(STYLE_CONTEXT_VARIABLE)
+        navtabs = cls(**kwargs)
+        label_variable = Variable(label_attr)
+        id_variable = Variable(id_attr) if id_attr else None
+        template = get_body_template(body_template) if body_template else None
+        for item in items:
+            label = label_variable.resolve(item)
+            body = render_item_body(context, item, item_name, template, body_attr)
+            navtabs.tab(label, body, id=id_variable.resolve(item) if id_variable else None)
+        return navtabs
+
+    def tab(self, label, body, id=None, show=True, active=False, **data_attrs):
+        """
+        Adds a tab; ``body`` is escaped unless marked safe.  Hidden tabs (``show=False``) are
+        skipped entirely.  Returns the nav-tabs.
+        """
+        if not callable(body):
+            body = escape_body(body)
+        self.strip.add(self.add_tab(label, body, id, show, active, **data_attrs))
+        return self
+
+    def add_tab(self, label, body, id=None, show=True, active=False, **data_attrs):
+        """
+        Records a tab and returns its markup in the tab strip ("" if hidden).  ``body`` is the
+        rendered panel content, or a callable returning it, called when the panels are rendered.
+        """
+        self.counter += 1
+        if not id:
+            id = slugify(label)
+        if active or self.counter == self.active_index:
+            if show:
+                active = "active"
+            else:
+                # If the active index is actually not showing, push it down by one
+                active = ""
+                self.active_index += 1
+        else:
+            active = ""
+
+        # Store away certain data for rendering the panel
+        self.tabs.append(Tab(id, active, show, body))
+        if not show:
+            return ""
+        data_attrs = flatatt(dict((k.replace("_", "-"), v) for k, v in data_attrs.items()))
+        return self.render_template(
+            "tab", label=label, active=active, tab_id=id, data_attrs=data_attrs
+        )
+
+    def render_panel(self, tab):
+        content = tab.body
+        if callable(content):
+            content = content()
+        return self.render_template_segments(
+            "panel", "content", content, tab_id=tab.tab_id, active=tab.active
+        )
+
+    def iter_panels(self):
+        """Renders and yields each shown tab's content panel, one at a time."""
+        for tab in self.tabs:
+            if tab.show:
+                yield self.render_panel(tab)
+
+    def iter_render(self, strip=None):
+        """
+        Yields the tab strip (by default, the markup of the added tabs), then each content panel in
+        turn, as strings or ``Segments``.  Panel bodies given as callables are rendered only as
+        they are reached, so at most one of them is held in memory at a time.
+        """
+        if strip is None:
+            strip = self.strip
+        yield self.render_template_segments("wrapper", "content", strip)
+
+        parts = self.render_template_parts("panels_wrapper", "content")
+        if parts is None:
+            # An overridden wrapper template doesn't include its content exactly once
+            content = Segments()
+            for panel in self.iter_panels():
+                content.add(panel)
+            yield self.render_template("panels_wrapper", content=content.flatten())
+            return
+
+        head, tail = parts
+        yield head
+        yield from self.iter_panels()
+        yield tail
+
+    def render_segments(self, strip=None):
+        segments = Segments()
+        for chunk in self.iter_render(strip):
+            segments.add(chunk)
+        return segments
+
+
+class Modal(Component):
+    """
+    Builds a modal dialog from its ``body()`` and optional ``footer()``.  ``size`` ("sm" or "lg")
+    is not available for Bootstrap 2.
+    """
+
+    name = "bootstrap_modal"
+    templates = {
+        "wrapper": "modal/wrapper.html",
+        "header": "modal/header.html",
+        "body": "modal/body.html",
+        "footer": "modal/footer.html",
+    }
+
+    def __init__(self, id, title="", size=None, fade=True, **kwargs):
+        super(Modal, self).__init__(**kwargs)
+        check_capabilities(self, self.version, [(MODAL_SIZE, size, None)])
+        self.id = id
+        self.title = title
+        self.size = size
+        self.fade = fade
+        self.content = Segments()
+
+    def body(self, body):
+        """Adds the body; ``body`` is escaped unless marked safe.  Returns the modal."""
+        self.content.add(self.render_body(escape_body(body)))
+        return self
+
+    def footer(self, footer):
+        """Adds the footer; ``footer`` is escaped unless marked safe.  Returns the modal."""
+        self.content.add(self.render_footer(escape_body(footer)))
+        return self
+
+    def render_body(self, body):
+        return self.render_template_segments("body", "body", body, id=self.id)
+
+    def render_footer(self, footer):
+        return self.render_template_segments("footer", "footer", footer, id=self.id)
+
+    def render_wrapper(self, content):
+        """Renders the dialog with its header around ``content``, the rendered body and footer."""
+        header = self.render_template("header", id=self.id, title=self.title)
+        return self.render_template_segments(
+            "wrapper",
+            "content",
+            Segments([header]).add(content),
+            id=self.id,
+            size=self.size,
+            fade=self.fade,
+        )
+
+    def render_segments(self):
+        return self.render_wrapper(self.content)
+
+
+class Carousel(Component):
+    """
+    Builds a carousel, one ``slide()`` at a time.  ``active_slide`` is the 1-based index of the
+    slide shown first, and ``interval`` the milliseconds between slides (by default, Bootstrap's).
+    """
+
+    name = "bootstrap_carousel"
+    templates = {
+        "wrapper": "carousel/wrapper.html",
+        "slide": "carousel/slide.html",
+    }
+
+    def __init__(self, id, active_slide=1, interval=None, controls=True, indicators=True, **kwargs):
+        super(Carousel, self).__init__(**kwargs)
+        self.id = id
+        self.active_slide = active_slide
+        self.interval = interval
+        self.controls = controls
+        self.indicators = indicators
+        self.counter = 0
+        self.slides = Segments()
+
+    def slide(self, body, caption=""):
+        """Adds a slide; ``body`` is escaped unless marked safe.  Returns the carousel."""
+        i, active = self.next_slide()
+        self.slides.add(self.render_slide(i, active, escape_body(body), caption))
+        return self
+
+    def next_slide(self):
+        """Counts a new slide, returning its index and its active class."""
+        self.counter += 1
+        return self.counter, "active" if self.counter == self.active_slide else ""
+
+    def render_slide(self, i, active, body, caption=""):
+        return self.render_template_segments(
+            "slide", "body", body, id=self.id, i=i, active=active, caption=caption
+        )
+
+    def render_wrapper(self, content):
+        indicators = []
+        if self.indicators:
+            indicators = [
+                (i, "active" if i + 1 == self.active_slide else "") for i in range(self.counter)
+            ]
+        return self.render_template_segments(
+            "wrapper",
+            "content",
+            content,
+            id=self.id,
+            interval=self.interval,
+            controls=self.controls,
+            indicators=indicators,
+        )
+
+    def render_segments(self):
+        return self.render_wrapper(self.slides)
+
+
+class Dropdown(Component):
+    """
+    Builds a dropdown menu of ``item()`` links, ``header()`` labels and ``divider()`` lines, opened
+    by a toggle showing ``label``.  ``right`` aligns the menu with the toggle's right edge.
+    """
+
+    name = "bootstrap_dropdown"
+    templates = {
+        "wrapper": "dropdown/wrapper.html",
+        "item": "dropdown/item.html",
+        "header": "dropdown/header.html",
+        "divider": "dropdown/divider.html",
+    }
+
+    def __init__(self, label, id=None, right=False, **kwargs):
+        super(Dropdown, self).__init__(**kwargs)
+        self.label = label
+        self.id = id
+        self.right = right
+        self.entries = Segments()
+
+    def item(self, label, href="#", active=False, disabled=False):
+        """Adds a link; ``label`` is escaped unless marked safe.  Returns the dropdown."""
+        self.entries.add(self.render_item(escape_body(label), href, active, disabled))
+        return self
+
+    def header(self, label):
+        self.entries.add(self.render_header(escape_body(label)))
+        return self
+
+    def divider(self):
+        self.entries.add(self.render_divider())
+        return self
+
+    def render_item(self, label, href="#", active=False, disabled=False):
+        state = "disabled" if disabled else "active" if active else ""
+        return self.render_template_segments("item", "label", label, href=href, state=state)
+
+    def render_header(self, label):
+        return self.render_template_segments("header", "label", label)
+
+    def render_divider(self):
+        return self.render_template("divider")
+
+    def render_wrapper(self, content):
+        return self.render_template_segments(
+            "wrapper", "content", content, label=self.label, id=self.id, right=self.right
+        )
+
+    def render_segments(self):
+        return self.render_wrapper(self.entries)
+
+
+class ListGroup(Component):
+    """
+    Builds a list group, one ``item()`` at a time.  Items with an ``href`` are links.  The
+    contextual ``style`` of an item (e.g. "success") is not available for Bootstrap 2.
+    """
+
+    name = "bootstrap_listgroup"
+    templates = {
+        "wrapper": "listgroup/wrapper.html",
+        "item": "listgroup/item.html",
+    }
+
+    def __init__(self, **kwargs):
+        super(ListGroup, self).__init__(**kwargs)
+        self.items = Segments()
+
+    def item(self, body, href=None, active=False, disabled=False, style=None, badge=None):
+        """Adds an item; ``body`` is escaped unless marked safe.  Returns the list group."""
+        self.items.add(self.render_item(escape_body(body), href, active, disabled, style, badge))
+        return self
+
+    def render_item(self, body, href=None, active=False, disabled=False, style=None, badge=None):
+        check_capabilities(self, self.version, [(LISTGROUP_ITEM_STYLE, style, None)])
+        state = "disabled" if disabled else "active" if active else ""
+        return self.render_template_segments(
+            "item", "body", body, href=href, state=state, style=style, badge=badge
+        )
+
+    def render_wrapper(self, content):
+        return self.render_template_segments("wrapper", "content", content)
+
+    def render_segments(self):
+        return self.render_wrapper(self.items)
+
+
+def render_accordion_from(items, id, context=None, request=None, style_version=None, **kwargs):
+    """
+    Renders an accordion with a panel for each of ``items``, like
+    ``{% bootstrap_accordion_from %}``, taking the same keyword arguments.  ``context`` is a dict
+    available to the body template.
+    """
+    return Accordion.from_items(
+        items, id, context=context, request=request, style_version=style_version, **kwargs
+    ).render()
+
+
+def render_navtabs_from(items, context=None, request=None, style_version=None, **kwargs):
+    """
+    Renders nav-tabs with a tab for each of ``items``, like ``{% bootstrap_navtabs_from %}``,
+    taking the same keyword arguments.  ``context`` is a dict available to the body template.
+    """
+    return NavTabs.from_items(
+        items, context=context, request=request, style_version=style_version, **kwargs
+    ).render()
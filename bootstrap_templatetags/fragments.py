@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import engines
+from django.template.base import Node, TextNode, Variable, VariableNode
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.template.loader import get_template
+
+from . import native
+from .styles import styles
+
+
+class Fragment(object):
+    """
+    A fragment template resolved through the configured template loaders.  The source file's
+    modification time is remembered so that edits can be noticed while ``settings.DEBUG`` is on.
+
+    When ``settings.BOOTSTRAP_TEMPLATETAGS_COMPILED`` is True and the resolved template is the one
+    shipped with this app, rendering is delegated to the equivalent native renderer instead.  A
+    fragment that its style pack renders natively has no ``template`` at all.
+    """
+
+    def __init__(self, style, name, template, renderer=None):
+        self.style = style
+        self.name = name
+        self.template = template
+        self.path = getattr(getattr(template, "origin", None), "name", None)
+        self.mtime = self.get_mtime()
+        self.plain_slots = {}
+
+        self.native = renderer
+        if renderer is None and getattr(settings, "BOOTSTRAP_TEMPLATETAGS_COMPILED", False):
+            self.native = native.get_renderer(style, name, self.path)
+
+    def get_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except (OSError, TypeError, ValueError):
+            return None
+
+    def is_stale(self):
+        """Returns True if the template file has changed on disk since it was resolved."""
+        return self.mtime is not None and self.get_mtime() != self.mtime
+
+    def has_plain_slot(self, slot):
+        """
+        Returns True if the template outputs its ``slot`` variable exactly once, as a bare
+        ``{{ slot }}`` outside any block tag, and refers to it nowhere else.  Only then can the
+        slot's content be placed between the markup rendered around it (see
+        ``Component.render_template_parts``), since a filter or a condition would otherwise apply
+        to a placeholder instead of the content.
+        """
+        plain = self.plain_slots.get(slot)
+        if plain is None:
+            plain = self.plain_slots[slot] = is_plain_slot(
+                getattr(self.template, "template", None), slot
+            )
+        return plain
+
+    def render(self, context):
+        if self.native is not None:
+            return self.native(context)
+        return self.template.render(context)
+
+
+def is_plain_slot(template, slot):
+    """See ``Fragment.has_plain_slot``; ``template`` is a compiled Django template, if any."""
+    nodelist = getattr(template, "nodelist", None)
+    if nodelist is None:
+        return False
+    outputs = [
+        node
+        for node in nodelist
+        if isinstance(node, VariableNode)
+        and isinstance(node.filter_expression.var, Variable)
+        and node.filter_expression.var.var == slot
+        and not node.filter_expression.filters
+    ]
+    if len(outputs) != 1:
+        return False
+    reference = re.compile(r"(?<![\w.])%s\b" % re.escape(slot))
+    for node in nodelist.get_nodes_by_type(Node):
+        if node is outputs[0] or isinstance(node, TextNode):
+            continue
+        if isinstance(node, (ExtendsNode, IncludeNode)):
+            # The slot may be used by another template, out of sight
+            return False
+        token = getattr(node, "token", None)
+        if token is None or reference.search(token.contents):
+            return False
+    return True
+
+
+class FragmentRegistry(object):
+    """
+    Per-process registry of resolved fragment templates, keyed by (style, template name).  Each
+    template is looked up through its style pack and the loaders only once; afterwards the compiled
+    ``Template`` is reused for every render.
+    """
+
+    def __init__(self):
+        self._fragments = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Bumped whenever a fragment is resolved or forgotten, so that output derived from the
+        # fragments (see ``EasyTag.get_fold_key``) can tell it is outdated
+        self.generation = 0
+
+    def get(self, style, name):
+        """Returns the ``Fragment`` for template ``name`` of the given ``style``."""
+        key = (style, name)
+        fragment = self._fragments.get(key)
+        stale = fragment is not None and settings.DEBUG and fragment.is_stale()
+        if fragment is not None and not stale:
+            self.hits += 1
+            return fragment
+
+        with self._lock:
+            if stale:
+                reset_cached_loaders()
+            self.misses += 1
+            self.generation += 1
+            pack = styles.get(style)
+            renderer = pack.renderers.get(name)
+            if renderer is not None:
+                fragment = Fragment(style, name, None, renderer)
+            else:
+                fragment = Fragment(style, name, get_template(pack.get_template_name(name)))
+            self._fragments[key] = fragment
+        return fragment
+
+    def forget_stale(self):
+        """
+        Forgets the fragments whose template files have changed on disk, so that they are resolved
+        anew, and bumps ``generation`` if there were any.  Returns whether there were.
+        """
+        stale = [key for key, fragment in list(self._fragments.items()) if fragment.is_stale()]
+        if not stale:
+            return False
+        with self._lock:
+            for key in stale:
+                self._fragments.pop(key, None)
+            reset_cached_loaders()
+            self.generation += 1
+        return True
+
+    def clear(self):
+        """Forgets all resolved fragments and resets the hit/miss counters."""
+        with self._lock:
+            self._fragments.clear()
+            self.hits = 0
+            self.misses = 0
+            self.generation += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._fragments)}
+
+
+fragments = FragmentRegistry()
+
+
+def reset_cached_loaders():
+    """Drops the compiled templates held by any cached loader so edited files are re-read."""
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        for loader in getattr(engine, "template_loaders", ()):
+            if hasattr(loader, "reset"):
+                loader.reset()
+
+
+@receiver(setting_changed)
+def clear_fragments(setting, **kwargs):
+    """Template configuration changes (usually from tests) invalidate every resolved fragment."""
+    if setting in ("TEMPLATES", "DEBUG", "INSTALLED_APPS") or setting.startswith(
+        "BOOTSTRAP_TEMPLATETAGS_"
+    ):
+        fragments.clear()
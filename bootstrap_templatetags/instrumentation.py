@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import re
+import threading
+import time
+from contextlib import nullcontext
+
+from django.dispatch import Signal
+
+# Sent after each timed step of rendering, when anything is connected:
+#   sender: the tag class
+#   kind: "tag" (a whole EasyTag render), "handler" (one handler call) or "fragment" (one
+#       render_template call)
+#   name: the tag, handler or fragment template name
+#   duration: seconds spent in the step
+#   child_duration: seconds of ``duration`` that were spent in nested timed steps
+render_timing = Signal()
+
+_local = threading.local()
+_disabled = nullcontext()
+
+
+class Timer(object):
+    __slots__ = ("sender", "kind", "name", "start", "child_duration")
+
+    def __init__(self, sender, kind, name):
+        self.sender = sender
+        self.kind = kind
+        self.name = name
+        self.child_duration = 0.0
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        stack = _local.stack
+        stack.pop()
+        if stack:
+            stack[-1].child_duration += duration
+        render_timing.send(
+            sender=self.sender,
+            kind=self.kind,
+            name=self.name,
+            duration=duration,
+            child_duration=self.child_duration,
+        )
+
+
+def timed(sender, kind, name):
+    """
+    Returns a context manager timing a step of rendering for ``render_timing``.  It does nothing if
+    no receivers are connected.
+    """
+    if not render_timing.receivers:
+        return _disabled
+    return Timer(sender, kind, name)
+
+
+class TimingRecord(object):
+    """Aggregated timings of one kind/name pair."""
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.child = 0.0
+
+    @property
+    def self_time(self):
+        return self.total - self.child
+
+    def add(self, duration, child_duration):
+        self.count += 1
+        self.total += duration
+        self.child += child_duration
+
+    def __repr__(self):
+        return "<TimingRecord %s %s: n=%d total=%.6f self=%.6f>" % (
+            self.kind,
+            self.name,
+            self.count,
+            self.total,
+            self.self_time,
+        )
+
+
+class TimingCollector(object):
+    """
+    Aggregates ``render_timing`` for the current thread while in use as a context manager::
+
+        with TimingCollector() as collector:
+            template.render(context)
+        for record in collector.summary():
+            print(record.kind, record.name, record.total, record.self_time)
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.get_ident()
+        render_timing.connect(self.receive, weak=False, dispatch_uid=self.dispatch_uid)
+        return self
+
+    def __exit__(self, *exc_info):
+        render_timing.disconnect(dispatch_uid=self.dispatch_uid)
+
+    @property
+    def dispatch_uid(self):
+        return "bootstrap_templatetags.TimingCollector.%d" % id(self)
+
+    def receive(self, sender, kind, name, duration, child_duration, **kwargs):
+        if threading.get_ident() != self.thread:
+            return
+        key = (kind, name)
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = TimingRecord(kind, name)
+        record.add(duration, child_duration)
+
+    def summary(self):
+        """Returns the aggregated records, slowest first."""
+        return sorted(self.records.values(), key=lambda record: record.total, reverse=True)
+
+    def server_timing(self):
+        """Formats the records as the value of a ``Server-Timing`` header."""
+        metrics = []
+        for record in self.summary():
+            metric = re.sub(r"[^\w.-]", "-", "bt-{}-{}".format(record.kind, record.name))
+            metrics.append(
+                '{metric};dur={total:.3f};desc="{count}x, self {self_time:.3f}ms"'.format(
+                    metric=metric,
+                    total=record.total * 1000,
+                    count=record.count,
+                    self_time=record.self_time * 1000,
+                )
+            )
+        return ", ".join(metrics)
+
+
+class ServerTimingMiddleware(object):
+    """Adds a ``Server-Timing`` header with the bootstrap tags' rendering times to responses."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with TimingCollector() as collector:
+            response = self.get_response(request)
+        header = collector.server_timing()
+        if header:
+            if response.has_header("Server-Timing"):
+                header = "{}, {}".format(response["Server-Timing"], header)
+            response["Server-Timing"] = header
+        return response
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Jinja2 extensions providing ``bootstrap_accordion`` and ``bootstrap_navtabs`` with the same
+arguments as the Django tags::
+
+    TEMPLATES = [
+        {
+            "BACKEND": "django.template.backends.jinja2.Jinja2",
+            "OPTIONS": {
+                "extensions": [
+                    "bootstrap_templatetags.jinja.AccordionExtension",
+                    "bootstrap_templatetags.jinja.NavTabsExtension",
+                ],
+            },
+        },
+        ...
+    ]
+
+The fragment templates are found through the fragment registry, like the Django tags do, and
+compiled once per environment by Jinja itself.  ``lazy`` and ``cache`` are Django-only.
+"""
+from django.utils.safestring import mark_safe
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from .components import STYLE_CONTEXT_VARIABLE, get_default_style
+from .fragments import fragments
+from .instrumentation import timed
+from .templatetags.bootstrap_tags import BootstrapAccordion, BootstrapNavTabs
+
+# Arguments of the Django tags that need Django's template nodes
+UNSUPPORTED_ARGUMENTS = ("lazy", "lazy_context", "cache", "vary_on")
+
+
+class ComponentExtension(Extension):
+    """
+    Base for the extensions.  The body of the tag is compiled to a call block whose caller receives
+    the component builder, so that the section call blocks within it (e.g. ``{% panel %}``) can
+    reach their own builder even when components are nested.
+    """
+
+    # The Django tag class whose arguments, fragment templates and builder are shared
+    tag = None
+    section = None
+
+    def __init__(self, environment):
+        super(ComponentExtension, self).__init__(environment)
+        self.compiled = {}
+
+    @property
+    def builder_name(self):
+        return "_bootstrap_%s" % self.tag.name
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        arguments = self.parse_arguments(parser, self.tag.name, lineno, ["style_version"])
+
+        section = "name:%s" % self.section
+        end = "name:end%s" % self.tag.name
+        body = parser.parse_statements((section, end))
+        while parser.stream.current.test(section):
+            section_lineno = next(parser.stream).lineno
+            section_arguments = self.parse_arguments(parser, self.section, section_lineno)
+            section_body = parser.parse_statements((section, end))
+            call = self.call_method(
+                "render_section", [nodes.Name(self.builder_name, "load"), section_arguments]
+            )
+            body.append(nodes.CallBlock(call, [], [], section_body).set_lineno(section_lineno))
+        next(parser.stream)
+
+        call = self.call_method("render_component", [nodes.ContextReference(), arguments])
+        return nodes.CallBlock(call, [nodes.Name(self.builder_name, "param")], [], body).set_lineno(
+            lineno
+        )
+
+    def parse_arguments(self, parser, name, lineno, options=()):
+        """
+        Parses the arguments of the ``name`` tag piece, positional or ``key=value`` and optionally
+        separated by commas, into a dict node.  They are checked against the Django handler's
+        signature, raising the same errors at compile time.
+        """
+        spec = self.tag.handler_specs[name]
+        params = [param for param in spec.params if param not in UNSUPPORTED_ARGUMENTS]
+        items = []
+        keys = []
+        positional = True
+        stream = parser.stream
+        while stream.current.type != "block_end":
+            if items:
+                stream.skip_if("comma")
+            if stream.current.type == "name" and stream.look().type == "assign":
+                key = next(stream).value
+                next(stream)
+                positional = False
+            elif not positional:
+                parser.fail(
+                    "'%s' received a positional argument after a keyword one" % name, lineno
+                )
+            elif len(keys) < len(params):
+                key = params[len(keys)]
+            else:
+                parser.fail("'%s' received too many positional arguments" % name, lineno)
+
+            if key in UNSUPPORTED_ARGUMENTS:
+                parser.fail("'%s' argument '%s' is not supported with Jinja2" % (name, key), lineno)
+            if key not in params and key not in options and not spec.varkw:
+                parser.fail("'%s' received unexpected keyword argument '%s'" % (name, key), lineno)
+            if key in keys:
+                parser.fail(
+                    "'%s' received multiple values for keyword argument '%s'" % (name, key), lineno
+                )
+            value = parser.parse_expression()
+            if isinstance(value, nodes.Const) and isinstance(value.value, str):
+                # Like Django, treat string literals in the template as safe
+                value = nodes.MarkSafe(value, lineno=lineno)
+            keys.append(key)
+            items.append(nodes.Pair(nodes.Const(key), value, lineno=lineno))
+
+        required = spec.params[: len(spec.params) - len(spec.defaults or ())]
+        missing = [param for param in required if param not in keys]
+        if missing:
+            parser.fail(
+                "'%s' did not receive value(s) for the argument(s): %s"
+                % (name, ", ".join("'%s'" % param for param in missing)),
+                lineno,
+            )
+        return nodes.Dict(items, lineno=lineno)
+
+    def get_component(self, context, arguments):
+        """Returns the builder for one render, with the style resolved as the Django tags do."""
+        arguments = dict(arguments)
+        style_version = arguments.pop("style_version", None) or context.get(STYLE_CONTEXT_VARIABLE)
+        return self.tag.component(
+            style_version=style_version,
+            templates=self.tag.get_templates(style_version or get_default_style()),
+            sender=self.__class__,
+            renderer=self.render_fragment,
+            **arguments,
+        )
+
+    def render_fragment(self, sender, version, template_name, context):
+        """
+        Renders a fragment template compiled by this environment.  It is compiled again whenever
+        the fragment registry resolves the template anew (e.g. after an edit while debugging).
+        Fragments that their style pack renders natively are rendered as they are.
+        """
+        fragment = fragments.get(version or get_default_style(), template_name)
+        if fragment.template is None:
+            with timed(sender, "fragment", fragment.name):
+                return mark_safe(fragment.render(context))
+        key = (fragment.style, fragment.name)
+        compiled = self.compiled.get(key)
+        if compiled is None or compiled[0] is not fragment:
+            compiled = self.compiled[key] = (fragment, self.compile_fragment(fragment))
+        with timed(sender, "fragment", fragment.name):
+            return mark_safe(compiled[1].render(context))
+
+    def compile_fragment(self, fragment):
+        source = getattr(fragment.template.template, "source", None)
+        if source is None:
+            with open(fragment.path) as f:
+                source = f.read()
+        # The autoescape block also keeps Jinja from dropping the source's trailing newline, which
+        # Django preserves.
+        return self.environment.from_string(
+            "{% autoescape true %}" + source + "{% endautoescape %}"
+        )
+
+
+class AccordionExtension(ComponentExtension):
+    tags = {"bootstrap_accordion"}
+    tag = BootstrapAccordion
+    section = "panel"
+
+    def render_component(self, context, arguments, caller):
+        accordion = self.get_component(context, arguments)
+        return Markup(accordion.render_wrapper(caller(accordion)).flatten())
+
+    def render_section(self, accordion, arguments, caller):
+        style = arguments.get("style")
+        i, active = accordion.next_panel(style)
+        return Markup(
+            accordion.render_panel(i, active, arguments["heading"], caller(), style).flatten()
+        )
+
+
+class NavTabsExtension(ComponentExtension):
+    tags = {"bootstrap_navtabs"}
+    tag = BootstrapNavTabs
+    section = "tab"
+
+    def render_component(self, context, arguments, caller):
+        navtabs = self.get_component(context, arguments)
+        strip = caller(navtabs)
+        return Markup(navtabs.render_segments(strip).flatten())
+
+    def render_section(self, navtabs, arguments, caller):
+        # The panel is rendered by calling ``caller`` after the whole tab strip
+        return Markup(navtabs.add_tab(body=caller, **arguments))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import NoReverseMatch, reverse
+
+SALT = "bootstrap_templatetags.lazy"
+
+# How long, in seconds, a lazy URL stays valid unless BOOTSTRAP_TEMPLATETAGS_LAZY_MAX_AGE says
+# otherwise: a day, so that pages left open keep working without URLs remaining valid forever
+DEFAULT_MAX_AGE = 60 * 60 * 24
+
+
+def parse_names(names):
+    """Accepts a comma-separated string or an iterable of context variable names."""
+    if not names:
+        return []
+    if isinstance(names, str):
+        names = names.split(",")
+    return [name.strip() for name in names if name.strip()]
+
+
+def is_available(node):
+    """
+    Lazy rendering needs to find the node again from a fresh request, so it is only possible for
+    tags in templates that were loaded by name.
+    """
+    origin = getattr(node, "origin", None)
+    return getattr(origin, "template_name", None) is not None and hasattr(node, "token")
+
+
+def make_url(node, index, context, names=None):
+    """
+    Returns a signed URL which renders the body following ``node.nodelists[index]`` on its own.
+    The values of the context variables listed in ``names`` are carried along in the signed
+    payload, so they must be JSON serializable.  The payload is signed, not encrypted: the client
+    can read the template name, the tag and those values.
+    """
+    payload = {
+        "t": node.origin.template_name,
+        "l": [node.token.lineno, node.token.contents],
+        "i": index,
+        "c": {name: context.get(name) for name in parse_names(names)},
+    }
+    token = signing.dumps(payload, salt=SALT, compress=True)
+    try:
+        return reverse("bootstrap_templatetags:lazy", args=[token])
+    except NoReverseMatch:
+        raise ImproperlyConfigured(
+            "Lazy bootstrap tags need 'bootstrap_templatetags.urls' included in your URLconf."
+        )
+
+
+def locate(template, nodetype, location):
+    """Finds the node of ``nodetype`` in ``template`` (an engine Template) at ``location``."""
+    lineno, contents = location
+    for node in template.nodelist.get_nodes_by_type(nodetype):
+        token = getattr(node, "token", None)
+        if token is not None and token.lineno == lineno and token.contents == contents:
+            return node
+    return None
+
+
+def get_max_age():
+    """Returns how long, in seconds, a lazy URL stays valid, or None if it never expires."""
+    return getattr(settings, "BOOTSTRAP_TEMPLATETAGS_LAZY_MAX_AGE", DEFAULT_MAX_AGE)
+
+
+def load(token):
+    """Returns the payload of a token made by ``make_url()``.  Raises ``signing.BadSignature``."""
+    return signing.loads(token, salt=SALT, max_age=get_max_age())
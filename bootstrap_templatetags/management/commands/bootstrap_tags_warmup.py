@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand, CommandError
+
+from ...warmup import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        "Compiles the bootstrap fragment templates and every template that loads bootstrap_tags, "
+        "reporting the time taken by each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--style",
+            action="append",
+            dest="styles",
+            help="Style whose fragments to compile; may be repeated (default: the configured one)",
+        )
+        parser.add_argument(
+            "--all-styles",
+            action="store_true",
+            help="Compile the fragments of every registered style pack",
+        )
+        parser.add_argument(
+            "--fail-on-error",
+            action="store_true",
+            help="Exit with an error if any template fails to compile",
+        )
+
+    def handle(self, *args, **options):
+        results = warmup(styles="all" if options["all_styles"] else options["styles"])
+        failures = [result for result in results if result.error is not None]
+        for result in results:
+            line = "%8.1f ms  %s" % (result.duration * 1000, result.name)
+            if result.error is None:
+                self.stdout.write(line)
+            else:
+                self.stderr.write("%s: %s" % (line, result.error))
+        self.stdout.write(
+            "Compiled %d templates in %.1f ms"
+            % (len(results) - len(failures), sum(result.duration for result in results) * 1000)
+        )
+        if failures and options["fail_on_error"]:
+            raise CommandError("%d templates failed to compile" % len(failures))
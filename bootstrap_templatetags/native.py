@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Plain Python equivalents of the shipped fragment templates, used when
+``settings.BOOTSTRAP_TEMPLATETAGS_COMPILED`` is True.  Each renderer must produce exactly the same
+markup as the template it replaces, including whitespace.
+"""
+
+import os
+
+from django.utils.formats import localize
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+def value(context, key):
+    """Renders ``context[key]`` the way ``{{ key }}`` would in an autoescaping template."""
+    return conditional_escape(localize(template_localtime(context.get(key, ""))))
+
+
+def accordion_wrapper_bootstrap2(context):
+    return mark_safe(
+        '<div class="accordion" id="%s">%s</div>\n'
+        % (value(context, "id"), value(context, "content"))
+    )
+
+
+def accordion_heading_bootstrap2(context):
+    id = value(context, "id")
+    return mark_safe(
+        '<div class="accordion-heading">\n'
+        '    <a data-parent="#%s" href="#%s-panel-%s" class="accordion-toggle" '
+        'data-toggle="collapse">\n'
+        "        %s\n"
+        "    </a>\n"
+        "</div>\n" % (id, id, value(context, "i"), value(context, "heading"))
+    )
+
+
+def accordion_body_bootstrap2(context):
+    return mark_safe(
+        '<div id="%s-panel-%s" class="accordion-body collapse %s">\n'
+        '    <div class="accordion-inner">\n'
+        "        %s\n"
+        "    </div>\n"
+        "</div>\n"
+        % (
+            value(context, "id"),
+            value(context, "i"),
+            value(context, "active"),
+            value(context, "body"),
+        )
+    )
+
+
+def accordion_panel_bootstrap2(context):
+    return mark_safe(
+        '<div class="accordion-group">\n'
+        "    %s\n"
+        "    %s\n"
+        "</div>\n" % (value(context, "panel_heading"), value(context, "panel_body"))
+    )
+
+
+def accordion_wrapper_bootstrap3(context):
+    return mark_safe(
+        '<div class="panel-group" id="%s">\n'
+        "    %s\n"
+        "</div>\n" % (value(context, "id"), value(context, "content"))
+    )
+
+
+def accordion_heading_bootstrap3(context):
+    id = value(context, "id")
+    if context.get("use_title"):
+        use_title = value(context, "use_title")
+        title_open = '<%s class="heading-title">' % use_title
+        title_close = "</%s>" % use_title
+    else:
+        title_open = title_close = ""
+    return mark_safe(
+        '<div class="panel-heading">\n'
+        "    %s\n"
+        '        <a href="#%s-panel-%s" data-toggle="collapse" data-parent="#%s" '
+        'class="accordion-toggle">\n'
+        "            %s\n"
+        "        </a>\n"
+        "    %s\n"
+        "</div>\n"
+        % (title_open, id, value(context, "i"), id, value(context, "heading"), title_close)
+    )
+
+
+def accordion_body_bootstrap3(context):
+    return mark_safe(
+        '<div id="%s-panel-%s" class="panel-collapse collapse %s">\n'
+        '    <div class="panel-body">\n'
+        "        %s\n"
+        "    </div>\n"
+        "</div>\n"
+        % (
+            value(context, "id"),
+            value(context, "i"),
+            value(context, "active"),
+            value(context, "body"),
+        )
+    )
+
+
+def accordion_panel_bootstrap3(context):
+    return mark_safe(
+        '<div class="panel panel-%s">\n'
+        "    %s\n"
+        "    %s\n"
+        "</div>\n"
+        % (value(context, "style"), value(context, "panel_heading"), value(context, "panel_body"))
+    )
+
+
+def navtabs_wrapper(context):
+    return mark_safe('<ul class="nav nav-tabs">%s</ul>\n' % value(context, "content"))
+
+
+def navtabs_tab_bootstrap2(context):
+    return mark_safe(
+        '<li class="%s"><a data-toggle="tab" href="#%s">%s</a></li>\n'
+        % (value(context, "active"), value(context, "tab_id"), value(context, "label"))
+    )
+
+
+def navtabs_tab_bootstrap3(context):
+    return mark_safe(
+        '<li class="%s"><a data-toggle="tab" href="#%s"%s>%s</a></li>\n'
+        % (
+            value(context, "active"),
+            value(context, "tab_id"),
+            value(context, "data_attrs"),
+            value(context, "label"),
+        )
+    )
+
+
+def navtabs_panels_wrapper(context):
+    return mark_safe('<div class="tab-content">%s</div>\n' % value(context, "content"))
+
+
+def navtabs_panel(context):
+    return mark_safe(
+        '<div class="tab-pane %s" id="%s">%s</div>\n'
+        % (value(context, "active"), value(context, "tab_id"), value(context, "content"))
+    )
+
+
+def lazy(context):
+    return mark_safe('<div class="bootstrap-lazy" data-url="%s"></div>\n' % value(context, "url"))
+
+
+renderers = {
+    ("bootstrap2", "accordion/wrapper.html"): accordion_wrapper_bootstrap2,
+    ("bootstrap2", "accordion/heading.html"): accordion_heading_bootstrap2,
+    ("bootstrap2", "accordion/body.html"): accordion_body_bootstrap2,
+    ("bootstrap2", "accordion/panel.html"): accordion_panel_bootstrap2,
+    ("bootstrap2", "navtabs/wrapper.html"): navtabs_wrapper,
+    ("bootstrap2", "navtabs/tab.html"): navtabs_tab_bootstrap2,
+    ("bootstrap2", "navtabs/panels_wrapper.html"): navtabs_panels_wrapper,
+    ("bootstrap2", "navtabs/panel.html"): navtabs_panel,
+    ("bootstrap2", "lazy.html"): lazy,
+    ("bootstrap3", "accordion/wrapper.html"): accordion_wrapper_bootstrap3,
+    ("bootstrap3", "accordion/heading.html"): accordion_heading_bootstrap3,
+    ("bootstrap3", "accordion/body.html"): accordion_body_bootstrap3,
+    ("bootstrap3", "accordion/panel.html"): accordion_panel_bootstrap3,
+    ("bootstrap3", "navtabs/wrapper.html"): navtabs_wrapper,
+    ("bootstrap3", "navtabs/tab.html"): navtabs_tab_bootstrap3,
+    ("bootstrap3", "navtabs/panels_wrapper.html"): navtabs_panels_wrapper,
+    ("bootstrap3", "navtabs/panel.html"): navtabs_panel,
+    ("bootstrap3", "lazy.html"): lazy,
+}
+
+
+def get_renderer(style, name, path):
+    """
+    Returns the native renderer for the fragment, or None if there isn't one or if the template
+    that the loaders resolved is not the one shipped with this app (i.e., the project overrides it).
+    """
+    renderer = renderers.get((style, name))
+    if renderer is None or path is None:
+        return None
+    shipped = os.path.join(TEMPLATES_DIR, style, *name.split("/"))
+    if os.path.normcase(os.path.abspath(path)) != os.path.normcase(shipped):
+        return None
+    return renderer
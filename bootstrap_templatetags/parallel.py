@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+DEFAULT_MAX_WORKERS = 16
+
+_executors = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_executor(workers):
+    """
+    Returns the shared thread pool of ``workers`` threads, at most
+    ``settings.BOOTSTRAP_TEMPLATETAGS_PARALLEL_MAX_WORKERS``.
+    """
+    workers = min(
+        workers,
+        getattr(settings, "BOOTSTRAP_TEMPLATETAGS_PARALLEL_MAX_WORKERS", DEFAULT_MAX_WORKERS),
+    )
+    executor = _executors.get(workers)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(workers)
+            if executor is None:
+                executor = _executors[workers] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="bootstrap_templatetags"
+                )
+    return executor
+
+
+def in_worker():
+    """Returns whether the current thread is rendering a body for ``render_deferred()``."""
+    return getattr(_local, "active", False)
+
+
+def render_deferred(deferred, workers):
+    """
+    Renders the ``Deferred`` bodies on a pool of ``workers`` threads, setting their content.
+    Bodies rendered by a worker never use the pool themselves, so nested parallel tags cannot wait
+    on a pool that is busy with their own parents.
+    """
+    for body, content in zip(deferred, get_executor(workers).map(render_body, deferred)):
+        body.content = content
+
+
+def render_body(body):
+    _local.active = True
+    close_old_connections()
+    try:
+        return body.render()
+    finally:
+        # Like the end of a request, release the worker's database connections as configured
+        close_old_connections()
+        _local.active = False
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from django.utils.safestring import mark_safe
+
+
+class Segments(list):
+    """
+    Rendered markup kept as a list of string segments.  Content placed into a fragment's slot is
+    added by reference rather than copied into every enclosing fragment's output, and the whole list
+    is joined only once, by ``flatten()``, by the outermost tag.
+
+    Like the output of ``NodeList.render()``, every segment is markup that is safe to output.
+    """
+
+    __slots__ = ()
+
+    # Strings shorter than this are merged into a short last segment rather than appended, since
+    # copying them is cheaper than keeping each one alive as a separate object until the join.
+    merge_size = 1024
+
+    def add(self, content):
+        """Appends ``content``, a string or another ``Segments``, and returns the list."""
+        if isinstance(content, Segments):
+            self.extend(content)
+        elif content:
+            if (
+                self
+                and len(content) < self.merge_size
+                and isinstance(self[-1], str)
+                and len(self[-1]) < self.merge_size
+            ):
+                self[-1] += content
+            else:
+                self.append(content)
+        return self
+
+    def resolve(self):
+        """Returns the segments with any ``Deferred`` content in place, rendering it if needed."""
+        return Segments(
+            [str(segment) if isinstance(segment, Deferred) else segment for segment in self]
+        )
+
+    def flatten(self):
+        try:
+            return mark_safe("".join(self))
+        except TypeError:
+            # Holds Deferred content, which is rendered now
+            return mark_safe("".join(map(str, self)))
+
+    def __html__(self):
+        return self.flatten()
+
+
+class Deferred(object):
+    """
+    A placeholder in ``Segments`` for content that is rendered separately, e.g. concurrently, and
+    put in place afterwards.  ``render`` is called with no arguments and returns a string.
+    """
+
+    __slots__ = ("render", "content")
+
+    def __init__(self, render):
+        self.render = render
+        self.content = None
+
+    def __str__(self):
+        if self.content is None:
+            self.content = self.render()
+        return self.content
+
+
+def flatten(content):
+    """Returns ``content``, a string or ``Segments``, as a single string."""
+    if isinstance(content, Segments):
+        return content.flatten()
+    return content
+
+
+def render_nodelist(nodelist, context):
+    """
+    Renders ``nodelist`` like ``NodeList.render()``, except that the output of the tags that can
+    provide ``Segments`` (see ``EasyTag.render_annotated_segments``) is kept unjoined.
+    """
+    segments = Segments()
+    for node in nodelist:
+        render = getattr(node, "render_annotated_segments", None)
+        if render is None:
+            segments.add(node.render_annotated(context))
+        else:
+            segments.add(render(context))
+    return segments
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from asgiref.sync import sync_to_async
+from django.template import Context
+from django.template.context import make_context
+from django.utils.safestring import mark_safe
+
+from .templatetags.easytag import EasyTag
+
+
+def get_template_context(template, context=None, request=None):
+    """
+    Accepts either a backend template (as returned by ``get_template()``) or a
+    ``django.template.Template``, returning the engine template and a ``Context`` for it.
+    """
+    if hasattr(template, "backend"):
+        context = make_context(context, request, autoescape=template.backend.engine.autoescape)
+        template = template.template
+    elif not isinstance(context, Context):
+        context = Context(context)
+    return template, context
+
+
+def stream_template(template, context=None, request=None):
+    """
+    Renders ``template`` as an iterator of string chunks, suitable for ``StreamingHttpResponse``.
+
+    ``template`` may be either a backend template (as returned by ``get_template()``) or a
+    ``django.template.Template``.  Bootstrap tags appearing at the top level of the template yield
+    their output progressively (see ``EasyTag.stream``); every other node is rendered whole.
+    """
+    template, context = get_template_context(template, context, request)
+
+    with context.render_context.push_state(template):
+        if context.template is None:
+            with context.bind_template(template):
+                context.template_name = template.name
+                yield from stream_nodelist(template.nodelist, context)
+        else:
+            yield from stream_nodelist(template.nodelist, context)
+
+
+def stream_nodelist(nodelist, context):
+    for node in nodelist:
+        if isinstance(node, EasyTag):
+            yield from node.stream(context)
+        else:
+            yield node.render_annotated(context)
+
+
+async def arender_template(template, context=None, request=None):
+    """
+    Renders ``template`` from async code, e.g. an ASGI view.  The section bodies of bootstrap tags
+    appearing at the top level of the template are rendered concurrently (see
+    ``EasyTag.arender``); every other node is rendered in a thread, as ``sync_to_async`` would.
+    """
+    template, context = get_template_context(template, context, request)
+
+    with context.render_context.push_state(template):
+        if context.template is None:
+            with context.bind_template(template):
+                context.template_name = template.name
+                return await arender_nodelist(template.nodelist, context)
+        return await arender_nodelist(template.nodelist, context)
+
+
+async def arender_nodelist(nodelist, context):
+    chunks = []
+    pending = []
+    for node in nodelist:
+        if not isinstance(node, EasyTag):
+            pending.append(node)
+            continue
+        if pending:
+            # Consecutive other nodes are rendered in a single trip to the sync thread
+            chunks.append(await sync_to_async(render_nodes)(pending, context))
+            pending = []
+        chunks.append(await node.arender(context))
+    if pending:
+        chunks.append(await sync_to_async(render_nodes)(pending, context))
+    return mark_safe("".join(chunks))
+
+
+def render_nodes(nodes, context):
+    return "".join([node.render_annotated(context) for node in nodes])
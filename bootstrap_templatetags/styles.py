@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of the Bootstrap styles the tags can render.  A style pack names the style, supplies its
+fragments (templates under its template directory, or native renderers), and lists the tag options
+it supports.  Packs are registered when this module is imported (the shipped ones) or when the app
+registry is ready, from a ``bootstrap_styles`` module of any installed app::
+
+    # myapp/bootstrap_styles.py
+    from bootstrap_templatetags.styles import BOOTSTRAP3_CAPABILITIES, StylePack, styles
+
+    styles.register(StylePack("mytheme", BOOTSTRAP3_CAPABILITIES))
+
+with the fragments of ``mytheme`` in ``myapp/templates/mytheme/``.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import autodiscover_modules
+
+# Tag options that only some styles support, named "<component>.<option>"
+ACCORDION_STYLE = "accordion.style"
+ACCORDION_USE_TITLE = "accordion.use_title"
+ACCORDION_PANEL_STYLE = "accordion.panel_style"
+MODAL_SIZE = "modal.size"
+LISTGROUP_ITEM_STYLE = "listgroup.item_style"
+
+BOOTSTRAP3_CAPABILITIES = frozenset(
+    [ACCORDION_STYLE, ACCORDION_USE_TITLE, ACCORDION_PANEL_STYLE, MODAL_SIZE, LISTGROUP_ITEM_STYLE]
+)
+
+
+class StylePack(object):
+    """
+    A Bootstrap style.  ``capabilities`` are the optional tag options it supports.  Its fragments
+    are the templates in ``template_dir`` (by default its ``name``) of the template loaders, except
+    for those named in ``renderers``, a dict of fragment names to native renderers: callables
+    taking the fragment's context dict and returning its markup.
+    """
+
+    __slots__ = ("name", "capabilities", "template_dir", "renderers")
+
+    def __init__(self, name, capabilities=(), template_dir=None, renderers=None):
+        self.name = name
+        self.capabilities = frozenset(capabilities)
+        self.template_dir = template_dir or name
+        self.renderers = dict(renderers or {})
+
+    def supports(self, capability):
+        return capability in self.capabilities
+
+    def get_template_name(self, name):
+        return "%s/%s" % (self.template_dir, name)
+
+
+class StyleRegistry(object):
+    """
+    Per-process registry of the style packs, keyed by name.  Packs are looked up once per fragment
+    by the fragment registry, so a registered style costs nothing on later renders.
+    """
+
+    def __init__(self):
+        self._packs = {}
+        self._lock = threading.Lock()
+        self.discovered = False
+
+    def register(self, pack):
+        """Registers ``pack``, replacing any pack of the same name, and returns it."""
+        with self._lock:
+            self._packs[pack.name] = pack
+        return pack
+
+    def unregister(self, name):
+        with self._lock:
+            self._packs.pop(name, None)
+
+    def get(self, name):
+        """Returns the pack of the style ``name``, raising ImproperlyConfigured if there is none."""
+        try:
+            return self._packs[name]
+        except KeyError:
+            raise ImproperlyConfigured(
+                "Unknown Bootstrap style %r; the registered styles are %s."
+                % (name, ", ".join(self.names()))
+            )
+
+    def names(self):
+        return sorted(self._packs)
+
+    def autodiscover(self):
+        """Imports the ``bootstrap_styles`` module of every installed app, once."""
+        if not self.discovered:
+            autodiscover_modules("bootstrap_styles")
+            self.discovered = True
+
+
+styles = StyleRegistry()
+
+styles.register(StylePack("bootstrap2"))
+styles.register(StylePack("bootstrap3", BOOTSTRAP3_CAPABILITIES))
+styles.register(StylePack("bootstrap4", BOOTSTRAP3_CAPABILITIES))
+styles.register(StylePack("bootstrap5", BOOTSTRAP3_CAPABILITIES))
+
+
+def check_capabilities(tag, style, uses):
+    """
+    Raises a ValueError if ``style`` does not support an option that is used, ``uses`` being a
+    list of (capability, value, default value) 3-tuples; an option is used unless its value is the
+    default.
+    """
+    pack = styles.get(style)
+    for capability, value, default_value in uses:
+        if value != default_value and not pack.supports(capability):
+            raise ValueError("%s's '%s' option not available for %s" % (tag.name, value, style))
@@ -1,67 +1,203 @@
 # -*- coding: utf-8 -*-
+from functools import partial
+
 from django import template
 from django.conf import settings
-from django.forms.utils import flatatt
-from django.template.defaultfilters import slugify
-from django.template.loader import render_to_string
-from django.utils.safestring import mark_safe
-
-from .easytag import EasyTag
+from django.template import TemplateSyntaxError
+
+from .. import lazy as lazy_module
+from ..components import (
+    SLOT_MARKER,
+    STYLE_CONTEXT_VARIABLE,
+    Accordion,
+    Carousel,
+    Dropdown,
+    ListGroup,
+    Modal,
+    NavTabs,
+    check_use_title,
+    get_body_template,
+    get_default_style,
+    render_fragment,
+    stop_unsupported_use,  # noqa: F401 (re-exported for third-party tags)
+)
+from ..fragments import fragments
+from ..segments import Segments, flatten
+from ..styles import ACCORDION_PANEL_STYLE, ACCORDION_STYLE, ACCORDION_USE_TITLE, check_capabilities
+from .easytag import Argument, EasyTag, Section, TagSpec
 
 register = template.Library()
 
-if not hasattr(settings, "BOOTSTRAP_TEMPLATETAGS_STYLE"):
-    raise AttributeError(
-        "settings.BOOTSTRAP_TEMPLATETAGS_STYLE is unset; please use 'bootstrap2' or 'bootstrap3'."
-    )
 
+class RenderState(object):
+    """What a container tag keeps in the render_context while its sections render."""
 
-def stop_unsupported_use(tag, style, required_values):
-    """
-    Raises a ValueError if settings.BOOTSTRAP_TEMPLATETAGS_STYLE is set inappropriately for the use
-    of values in the ``required_values`` list, which is a list of 2-tuples of user-defined values
-    paired to the required untampered value.
-    """
-    if settings.BOOTSTRAP_TEMPLATETAGS_STYLE == style:
-        for arg, default_value in required_values:
-            if arg != default_value:
-                raise ValueError("%s's '%s' option not available for %s" % (tag.name, arg, style))
+    __slots__ = ("component", "lazy", "lazy_context")
+
+    def __init__(self, component, lazy=False, lazy_context=None):
+        self.component = component
+        self.lazy = lazy
+        self.lazy_context = lazy_context
 
 
 class BaseBootstrapTag(EasyTag):
     """Provides simplified template fragment rendering. Should not be directly registered."""
 
+    # ``style_version`` selects the Bootstrap style for this tag, overriding the context and settings
+    options = EasyTag.options + ("style_version",)
+
+    # The ``components`` builder class that renders the tag's markup
+    component = None
+
     templates = {}
 
-    def render_template(self, name, version=settings.BOOTSTRAP_TEMPLATETAGS_STYLE, **context):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.spec is not None:
+            cls.templates = cls.spec.templates
+
+    @classmethod
+    def get_templates(cls, style):
+        """Returns the fragment templates the tag renders for ``style``, by key."""
+        if cls.spec is not None:
+            return cls.spec.get_templates(style)
+        return cls.templates
+
+    def get_style(self, context):
+        """
+        Returns the style to render with: the tag's ``style_version`` argument, else the context's
+        ``bootstrap_style`` variable, else settings.BOOTSTRAP_TEMPLATETAGS_STYLE.
+        """
+        if "style_version" in self.options:
+            style = self.options["style_version"].resolve(context)
+            if style:
+                return style
+        return context.get(STYLE_CONTEXT_VARIABLE) or get_default_style()
+
+    foldable = True
+
+    def is_static(self):
+        """Lazy sections are rendered per request, so lazy tags are never static."""
+        for binding, _nodelist in self.nodelists:
+            if binding.constants.get("lazy"):
+                return False
+        return super(BaseBootstrapTag, self).is_static()
+
+    def get_fold_key(self, context):
+        """
+        Static output depends on the style given by the context or settings (for any nested tags
+        too), and on the fragment templates, which may be resolved anew.  While debugging, edited
+        fragment templates are noticed first, as they are by ``fragments.get()``.
+        """
+        if settings.DEBUG:
+            fragments.forget_stale()
+        style = context.get(STYLE_CONTEXT_VARIABLE) or getattr(
+            settings, "BOOTSTRAP_TEMPLATETAGS_STYLE", None
+        )
+        return (fragments.generation, style)
+
+    def get_cache_key_parts(self, context):
+        """
+        Also varies on the style, and on the values of the ``lazy_context`` variables, which the
+        lazy URLs in the output carry.
+        """
+        parts = super(BaseBootstrapTag, self).get_cache_key_parts(context)
+        parts.append(self.get_style(context))
+        for binding, _nodelist in self.nodelists:
+            names = binding.resolve(context).get("lazy_context")
+            for name in lazy_module.parse_names(names):
+                parts.append((name, context.get(name)))
+        return parts
+
+    def get_cache_timeout(self, context):
+        """Keeps output holding lazy URLs no longer than the URLs' signatures stay valid."""
+        timeout = super(BaseBootstrapTag, self).get_cache_timeout(context)
+        max_age = lazy_module.get_max_age()
+        if timeout and max_age is not None and self.uses_lazy(context):
+            timeout = min(timeout, max_age)
+        return timeout
+
+    def uses_lazy(self, context):
+        return any(binding.resolve(context).get("lazy") for binding, _nodelist in self.nodelists)
+
+    def get_component(self, context, *args, **kwargs):
+        """Returns the tag's builder for the current render, rendering the tag's ``templates``."""
+        style = self.get_style(context)
+        return self.component(
+            *args,
+            style_version=style,
+            templates=self.get_templates(style),
+            sender=self.__class__,
+            **kwargs,
+        )
+
+    def render_template(self, name, version=None, **context):
         """
         Looks up ``name`` as a key to the tag's ``templates`` dictionary attribute and returns the
-        rendered string content.
+        rendered string content for the ``version`` style (by default, the style in settings).  The
+        template itself is resolved only once per process and style through the fragment registry.
         """
-        name = self.templates[name]
-        content = render_to_string("{version}/{name}".format(version=version, name=name), context)
-        return mark_safe(content)
+        templates = self.get_templates(version or get_default_style())
+        return render_fragment(self.__class__, version, templates[name], context)
 
 
 class BootstrapAccordion(BaseBootstrapTag):
-    name = "bootstrap_accordion"
-    intermediate_tags = ["group", "panel"]
-    end_tag = True
-
-    templates = {
-        "wrapper": "accordion/wrapper.html",
-        "heading": "accordion/heading.html",
-        "body": "accordion/body.html",
-        "panel": "accordion/panel.html",
-    }
-
-    def render(self, context):
+    spec = TagSpec(
+        "bootstrap_accordion",
+        arguments=[
+            Argument("id"),
+            Argument("active_panel", 1, types=int),
+            Argument("style", "default", types=str),
+            Argument("use_title", False),
+            Argument("lazy", False),
+            Argument("lazy_context", None, types=str),
+        ],
+        sections=[
+            Section("group", [Argument("heading"), Argument("style", "default", types=str)]),
+            Section("panel", [Argument("heading"), Argument("style", None, types=str)]),
+        ],
+        templates=Accordion.templates,
+    )
+
+    component = Accordion
+
+    def validate(self):
+        """
+        Checks the literal ``use_title`` argument, and the literal ``style`` and ``use_title``
+        arguments against the style when ``style_version`` is also given as a literal.  Otherwise
+        the style is only known when rendering, and they are checked then.
+        """
+        version = self.get_constant_option("style_version")
+        for binding, _nodelist in self.nodelists:
+            constants = binding.constants
+            try:
+                if binding.name == self.name:
+                    use_title = constants.get("use_title", False)
+                    check_use_title(self, use_title)
+                    if version:
+                        style = constants.get("style", "default")
+                        check_capabilities(
+                            self,
+                            version,
+                            [
+                                (ACCORDION_STYLE, style, "default"),
+                                (ACCORDION_USE_TITLE, use_title, False),
+                            ],
+                        )
+                elif version:
+                    check_capabilities(
+                        self, version, [(ACCORDION_PANEL_STYLE, constants.get("style"), None)]
+                    )
+            except ValueError as e:
+                raise TemplateSyntaxError(str(e))
+
+    def render_segments(self, context):
         """Wraps the entire output with the accordion div."""
-        content = super(BootstrapAccordion, self).render(context)
-        return self.render_template("wrapper", id=self.id, content=mark_safe(content))
+        content = super(BootstrapAccordion, self).render_segments(context)
+        return context.render_context[self].component.render_wrapper(content)
 
     def bootstrap_accordion(
-        self, context, nodelist, id, active_panel=1, style="default", use_title=False
+        self, context, nodelist, id, active_panel, style, use_title, lazy, lazy_context
     ):
         """
         Main handler, typically empty, but specifies the HTML id.
@@ -69,34 +205,32 @@ class BootstrapAccordion(BaseBootstrapTag):
         If provided, ``active_panel`` is a 1-based index to override which panel is expanded by
         default.
 
-        For Bootstrap 3, ``style`` controls the class type that will be applied to all panels in the
+        From Bootstrap 3, ``style`` controls the class type that will be applied to all panels in the
         group (unless a panel declares its own ``style`` argument).  This option is unavailable for
         Bootstrap 2, since legacy accordions did not support this 'type' paradigm.
 
-        For Bootstrap 3, ``use_title`` is optionally a string between 'h1' and 'h6' to describe the
+        From Bootstrap 3, ``use_title`` is optionally a string between 'h1' and 'h6' to describe the
         desire for an HTML title heading around the clickable panel text.  This produces, for
         example, <h1 class="panel-title> <a ...></a> </h1>" instead of just a link.
+
+        If ``lazy`` is True, only the active panel's body is rendered with the page.  The others
+        are replaced by a placeholder carrying a signed URL from which the body can be fetched
+        (see ``bootstrap_templatetags.urls``).  ``lazy_context`` names the context variables,
+        comma-separated, that the bodies need when rendered on their own.
         """
 
-        stop_unsupported_use(
-            self,
-            "bootstrap2",
-            [
-                (style, "default"),
-                (use_title, False),
-            ],
+        # The node is shared by every render of a compiled template, so per-render values live in
+        # the render_context rather than on ``self``.
+        context.render_context[self] = RenderState(
+            self.get_component(
+                context, id, active_panel=active_panel, style=style, use_title=use_title
+            ),
+            lazy and lazy_module.is_available(self),
+            lazy_context,
         )
-
-        if self not in context.render_context:
-            context.render_context[self] = {"counter": 0}
-
-        self.id = id
-        self.active_index = active_panel
-        self.global_style = style
-        self.use_title = use_title
         return nodelist.render(context)
 
-    def group(self, context, nodelist, heading, style="default"):
+    def group(self, context, nodelist, heading, style):
         import warnings
 
         warnings.warn(
@@ -105,124 +239,413 @@ class BootstrapAccordion(BaseBootstrapTag):
         )
         return self.panel(context, nodelist, heading, style=style)
 
-    def panel(self, context, nodelist, heading, style=None):
+    def panel(self, context, nodelist, heading, style):
         """
         Renders a simple header text and treats the following template content as the panel's body
         content.
         """
 
-        stop_unsupported_use(self, "bootstrap2", [(style, None)])
-
-        content = nodelist.render(context)
-        context.render_context[self]["counter"] += 1
-        i = context.render_context[self]["counter"]
-        active = "in" if self._is_active(i, context) else ""
-        data = {
-            "id": self.id,
-            "i": i,
-            "active": active,
-            "heading": heading,
-            "body": content,
-            "use_title": self.use_title,
-        }
-        panel_heading = self.render_template("heading", **data)
-        panel_body = self.render_template("body", **data)
-        return self.render_template(
-            "panel",
-            panel_heading=panel_heading,
-            panel_body=panel_body,
-            style=(style or self.global_style),
-            **data,
-        )
-
-    def _is_active(self, i, context):
-        return context.render_context[self]["counter"] == self.active_index
+        state = context.render_context[self]
+        accordion = state.component
+        i, active = accordion.next_panel(style)
+        if state.lazy and not active:
+            url = lazy_module.make_url(self, i, context, state.lazy_context)
+            content = accordion.render_template("lazy", url=url)
+        else:
+            content = self.render_nodelist(nodelist, context)
+        return accordion.render_panel(i, active, heading, content, style)
 
 
-register.tag(BootstrapAccordion.name, BootstrapAccordion.parser)
+BootstrapAccordion.register_tag(register)
 
 
 class BootstrapNavTabs(BaseBootstrapTag):
-    name = "bootstrap_navtabs"
-    intermediate_tags = ["tab"]
-    end_tag = True
-
-    templates = {
-        "wrapper": "navtabs/wrapper.html",
-        "tab": "navtabs/tab.html",
-        "panels_wrapper": "navtabs/panels_wrapper.html",
-        "panel": "navtabs/panel.html",
-    }
-
-    def render(self, context):
+    spec = TagSpec(
+        "bootstrap_navtabs",
+        arguments=[
+            Argument("active_tab", 1, types=int),
+            Argument("lazy", False),
+            Argument("lazy_context", None, types=str),
+        ],
+        sections=[
+            Section(
+                "tab",
+                [
+                    Argument("label"),
+                    Argument("id", None),
+                    Argument("show", True),
+                    Argument("active", False),
+                    Argument("lazy", None),
+                ],
+                varkw="data_attrs",
+            ),
+        ],
+        templates=NavTabs.templates,
+    )
+
+    component = NavTabs
+
+    def render_segments(self, context):
         """Wraps the entire output with the ul.nav.nav-tabs container."""
-        content = super(BootstrapNavTabs, self).render(context)
+        segments = Segments()
+        for chunk in self.iter_render(context):
+            segments.add(chunk)
+        return segments
+
+    def stream(self, context):
+        if self.is_cached():
+            yield self.render_annotated(context)
+            return
+        with self.preserved_state(context):
+            for chunk in self.iter_render(context):
+                yield flatten(chunk)
+
+    def iter_render(self, context):
+        """
+        Yields the tab strip, then each content panel in turn.  Panel bodies are rendered only as
+        they are reached, so at most one of them is held in memory at a time.
+        """
+        content = super(BootstrapNavTabs, self).render_segments(context)
+        yield from context.render_context[self].component.iter_render(content)
+
+    def bootstrap_navtabs(self, context, nodelist, active_tab, lazy, lazy_context):
+        """
+        Usually empty opening node handler.
 
-        # Mark rendered pieces as safe!
-        tabs = self.render_template("wrapper", content=mark_safe(content))
-        panels = self.render_template(
-            "panels_wrapper", content=mark_safe(self.render_content_panels(context))
+        If ``lazy`` is True, only the active tab's panel is rendered with the page; the others get
+        a placeholder with a signed URL for fetching them (see ``bootstrap_accordion``).  Each
+        ``{% tab %}`` may override this with its own ``lazy`` argument.
+        """
+        context.render_context[self] = RenderState(
+            self.get_component(context, active_tab=active_tab), lazy, lazy_context
         )
-        return "".join([tabs, panels])
 
-    def bootstrap_navtabs(self, context, nodelist, active_tab=1):
-        """Usually empty opening node handler."""
-        if self not in context.render_context:
-            context.render_context[self] = {
-                "tabs": [],
-                "counter": 0,
-            }
+        return nodelist.render(context)
+
+    def tab(self, context, nodelist, label, id, show, active, lazy, **data_attrs):
+        state = context.render_context[self]
+        navtabs = state.component
+        # Keep the panel innards for rendering after the tab strip
+        markup = navtabs.add_tab(
+            label, partial(self.render_nodelist, nodelist, context), id, show, active, **data_attrs
+        )
+        tab = navtabs.tabs[-1]
+
+        if lazy is None:
+            lazy = state.lazy
+        if show and lazy and not tab.active and lazy_module.is_available(self):
+            url = lazy_module.make_url(self, navtabs.counter, context, state.lazy_context)
+            tab.body = navtabs.render_template("lazy", url=url)
+        return markup
+
+
+BootstrapNavTabs.register_tag(register)
+
+
+class BootstrapAccordionFrom(BootstrapAccordion):
+    """
+    Renders an accordion with a panel for each item of an iterable, instead of ``{% panel %}``
+    sections: ``{% bootstrap_accordion_from items id="faq" heading_attr="name"
+    body_template="faq/answer.html" %}``.
+
+    The body template is compiled once and rendered for each item with the item pushed onto the
+    context as ``item_name``.  Alternatively, ``body_attr`` names an attribute or key of the items
+    to use as the body text.  Items are consumed one at a time, so generators are not materialized.
+    """
+
+    spec = TagSpec(
+        "bootstrap_accordion_from",
+        arguments=[
+            Argument("items"),
+            Argument("id"),
+            Argument("heading_attr", "heading", types=str),
+            Argument("body_template", None),
+            Argument("body_attr", None, types=str),
+            Argument("item_name", "item", types=str),
+            Argument("active_panel", 1, types=int),
+            Argument("style", "default", types=str),
+            Argument("use_title", False),
+        ],
+        end_tag=None,
+        templates=Accordion.templates,
+    )
+
+    render_segments = EasyTag.render_segments
+
+    def bootstrap_accordion_from(
+        self,
+        context,
+        items,
+        id,
+        heading_attr,
+        body_template,
+        body_attr,
+        item_name,
+        active_panel,
+        style,
+        use_title,
+    ):
+        style_version = self.get_style(context)
+        return self.component.from_items(
+            items,
+            id,
+            heading_attr=heading_attr,
+            body_template=body_template,
+            body_attr=body_attr,
+            item_name=item_name,
+            context=context,
+            active_panel=active_panel,
+            style=style,
+            use_title=use_title,
+            style_version=style_version,
+            templates=self.get_templates(style_version),
+            sender=self.__class__,
+        ).render_segments()
+
+
+BootstrapAccordionFrom.register_tag(register)
+
+
+class BootstrapNavTabsFrom(BootstrapNavTabs):
+    """
+    Renders nav-tabs with a tab for each item of an iterable, instead of ``{% tab %}`` sections:
+    ``{% bootstrap_navtabs_from items label_attr="name" body_template="tabs/item.html" %}``.
+    The body is produced as for ``bootstrap_accordion_from``; ``id_attr`` optionally names the
+    items' attribute holding the tab ids, which otherwise are the slugs of the labels.
+    """
+
+    spec = TagSpec(
+        "bootstrap_navtabs_from",
+        arguments=[
+            Argument("items"),
+            Argument("label_attr", "label", types=str),
+            Argument("body_template", None),
+            Argument("body_attr", None, types=str),
+            Argument("id_attr", None, types=str),
+            Argument("item_name", "item", types=str),
+            Argument("active_tab", 1, types=int),
+        ],
+        end_tag=None,
+        templates=NavTabs.templates,
+    )
+
+    stream = EasyTag.stream
+
+    render_segments = EasyTag.render_segments
+
+    def bootstrap_navtabs_from(
+        self, context, items, label_attr, body_template, body_attr, id_attr, item_name, active_tab
+    ):
+        style_version = self.get_style(context)
+        return self.component.from_items(
+            items,
+            label_attr=label_attr,
+            body_template=body_template,
+            body_attr=body_attr,
+            id_attr=id_attr,
+            item_name=item_name,
+            context=context,
+            active_tab=active_tab,
+            style_version=style_version,
+            templates=self.get_templates(style_version),
+            sender=self.__class__,
+        ).render_segments()
+
+
+BootstrapNavTabsFrom.register_tag(register)
+
+
+class BootstrapModal(BaseBootstrapTag):
+    """
+    ``{% bootstrap_modal id="confirm" title="Delete?" %}`` body ``{% footer %}`` buttons
+    ``{% endbootstrap_modal %}``.  The footer is optional; ``size`` ("sm" or "lg") and ``fade``
+    set the dialog's classes.
+    """
+
+    spec = TagSpec(
+        "bootstrap_modal",
+        arguments=[
+            Argument("id"),
+            Argument("title", ""),
+            Argument("size", None, types=str),
+            Argument("fade", True, types=bool),
+        ],
+        sections=[Section("footer")],
+        templates=Modal.templates,
+    )
+
+    component = Modal
+
+    def render_segments(self, context):
+        """Wraps the body and footer with the dialog and its header."""
+        content = super(BootstrapModal, self).render_segments(context)
+        return context.render_context[self].component.render_wrapper(content)
 
-        self.active_index = active_tab
+    def bootstrap_modal(self, context, nodelist, id, title, size, fade):
+        modal = self.get_component(context, id, title=title, size=size, fade=fade)
+        context.render_context[self] = RenderState(modal)
+        return modal.render_body(self.render_nodelist(nodelist, context))
 
+    def footer(self, context, nodelist):
+        modal = context.render_context[self].component
+        return modal.render_footer(self.render_nodelist(nodelist, context))
+
+
+BootstrapModal.register_tag(register)
+
+
+class BootstrapCarousel(BaseBootstrapTag):
+    """
+    ``{% bootstrap_carousel id="photos" %}{% slide caption="..." %}<img ...>...
+    {% endbootstrap_carousel %}``.  ``active_slide`` is the 1-based index of the slide shown first,
+    ``interval`` the milliseconds between slides, and ``controls`` and ``indicators`` toggle the
+    previous/next links and the slide indicators.
+    """
+
+    spec = TagSpec(
+        "bootstrap_carousel",
+        arguments=[
+            Argument("id"),
+            Argument("active_slide", 1, types=int),
+            Argument("interval", None, types=int),
+            Argument("controls", True, types=bool),
+            Argument("indicators", True, types=bool),
+        ],
+        sections=[Section("slide", [Argument("caption", "")])],
+        templates=Carousel.templates,
+    )
+
+    component = Carousel
+
+    def render_segments(self, context):
+        """Wraps the slides with the carousel, its indicators and controls."""
+        content = super(BootstrapCarousel, self).render_segments(context)
+        return context.render_context[self].component.render_wrapper(content)
+
+    def bootstrap_carousel(
+        self, context, nodelist, id, active_slide, interval, controls, indicators
+    ):
+        context.render_context[self] = RenderState(
+            self.get_component(
+                context,
+                id,
+                active_slide=active_slide,
+                interval=interval,
+                controls=controls,
+                indicators=indicators,
+            )
+        )
         return nodelist.render(context)
 
-    def tab(self, context, nodelist, label, id=None, show=True, active=False, **data_attrs):
-        context.render_context[self]["counter"] += 1
-        i = context.render_context[self]["counter"]
-
-        if not id:
-            id = slugify(label)
-        if active or self._is_active(i, context):
-            if show:
-                active = "active"
-            else:
-                # If the active index is actually not showing, push it down by one
-                active = ""
-                self.active_index += 1
-        else:
-            active = ""
-
-        # Store away certain data for rendering the panel
-        context.render_context[self]["tabs"].append(
-            {
-                "tab_id": id,
-                "active": active,
-                "show": show,
-            }
+    def slide(self, context, nodelist, caption):
+        carousel = context.render_context[self].component
+        i, active = carousel.next_slide()
+        return carousel.render_slide(i, active, self.render_nodelist(nodelist, context), caption)
+
+
+BootstrapCarousel.register_tag(register)
+
+
+class BootstrapDropdown(BaseBootstrapTag):
+    """
+    ``{% bootstrap_dropdown label="Actions" %}{% header %}Edit{% item href=url %}Rename
+    {% divider %}{% item href=url active=True %}Delete{% endbootstrap_dropdown %}``.  The content
+    following an ``{% item %}`` or ``{% header %}`` is its label; anything following a
+    ``{% divider %}`` is output as is.
+    """
+
+    spec = TagSpec(
+        "bootstrap_dropdown",
+        arguments=[
+            Argument("label"),
+            Argument("id", None),
+            Argument("right", False, types=bool),
+        ],
+        sections=[
+            Section(
+                "item",
+                [
+                    Argument("href", "#"),
+                    Argument("active", False, types=bool),
+                    Argument("disabled", False, types=bool),
+                ],
+            ),
+            Section("header"),
+            Section("divider"),
+        ],
+        templates=Dropdown.templates,
+    )
+
+    component = Dropdown
+
+    def render_segments(self, context):
+        """Wraps the menu entries with the toggle and menu."""
+        content = super(BootstrapDropdown, self).render_segments(context)
+        return context.render_context[self].component.render_wrapper(content)
+
+    def bootstrap_dropdown(self, context, nodelist, label, id, right):
+        context.render_context[self] = RenderState(
+            self.get_component(context, label, id=id, right=right)
         )
+        return nodelist.render(context)
 
-        if show:
-            # Render the panel innards, but don't return the string data yet
-            context.render_context[self]["tabs"][-1]["content"] = nodelist.render(context)
+    def item(self, context, nodelist, href, active, disabled):
+        dropdown = context.render_context[self].component
+        label = self.render_nodelist(nodelist, context)
+        return dropdown.render_item(label, href, active, disabled)
 
-            # Render the tab part
-            data_attrs = flatatt(dict((k.replace("_", "-"), v) for k, v in enumerate(data_attrs)))
-            return self.render_template(
-                "tab", label=label, active=active, tab_id=id, data_attrs=data_attrs
-            )
-        return ""
+    def header(self, context, nodelist):
+        dropdown = context.render_context[self].component
+        return dropdown.render_header(self.render_nodelist(nodelist, context))
+
+    def divider(self, context, nodelist):
+        dropdown = context.render_context[self].component
+        return Segments([dropdown.render_divider()]).add(self.render_nodelist(nodelist, context))
+
+
+BootstrapDropdown.register_tag(register)
 
-    def render_content_panels(self, context):
-        """Custom end handler to append output outside of the tabs wrapper."""
-        content_panels = []
-        for tab in context.render_context[self]["tabs"]:
-            if tab["show"]:
-                content_panels.append(self.render_template("panel", **tab))
-        return "".join(content_panels)
 
-    def _is_active(self, i, context):
-        return context.render_context[self]["counter"] == self.active_index
+class BootstrapListGroup(BaseBootstrapTag):
+    """
+    ``{% bootstrap_listgroup %}{% item href=url badge=count %}Inbox{% item %}Archive
+    {% endbootstrap_listgroup %}``.  The content following each ``{% item %}`` is its body; items
+    with an ``href`` are links.  An item's contextual ``style`` (e.g. "success") is not available
+    for Bootstrap 2.
+    """
+
+    spec = TagSpec(
+        "bootstrap_listgroup",
+        sections=[
+            Section(
+                "item",
+                [
+                    Argument("href", None),
+                    Argument("active", False, types=bool),
+                    Argument("disabled", False, types=bool),
+                    Argument("style", None, types=str),
+                    Argument("badge", None),
+                ],
+            ),
+        ],
+        templates=ListGroup.templates,
+    )
+
+    component = ListGroup
+
+    def render_segments(self, context):
+        """Wraps the items with the list group."""
+        content = super(BootstrapListGroup, self).render_segments(context)
+        return context.render_context[self].component.render_wrapper(content)
+
+    def bootstrap_listgroup(self, context, nodelist):
+        context.render_context[self] = RenderState(self.get_component(context))
+        return nodelist.render(context)
+
+    def item(self, context, nodelist, href, active, disabled, style, badge):
+        listgroup = context.render_context[self].component
+        body = self.render_nodelist(nodelist, context)
+        return listgroup.render_item(body, href, active, disabled, style, badge)
 
 
-register.tag(BootstrapNavTabs.name, BootstrapNavTabs.parser)
+BootstrapListGroup.register_tag(register)
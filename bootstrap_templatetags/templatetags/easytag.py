@@ -1,9 +1,342 @@
 # -*- coding: utf-8 -*-
-from functools import partial, wraps
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import copy
 from inspect import getfullargspec
+from types import MappingProxyType
 
-from django.template import Node
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.template import Node, TemplateSyntaxError
+from django.template.base import TextNode, Token, kwarg_re
 from django.template.library import parse_bits
+from django.utils import timezone, translation
+
+from .. import cache, parallel
+from ..instrumentation import timed
+from ..segments import Deferred, Segments, render_nodelist
+
+
+# Names that templates resolve from the context's builtins rather than from the template's data
+BUILTIN_CONSTANTS = {"True": True, "False": False, "None": None}
+
+
+def is_constant(value):
+    """Returns whether a compiled ``FilterExpression`` resolves to the same value on every render."""
+    if value.filters:
+        return False
+    if not value.is_var:
+        return True
+    variable = value.var
+    if variable.lookups is None:
+        return not variable.translate  # A number literal, rather than a translated string
+    return variable.var in BUILTIN_CONSTANTS
+
+
+def constant_value(value):
+    """Returns the value of a ``FilterExpression`` for which ``is_constant()`` is True."""
+    if not value.is_var:
+        return value.var
+    if value.var.lookups is None:
+        return value.var.literal
+    return BUILTIN_CONSTANTS[value.var.var]
+
+
+class HandlerSpec(object):
+    """The template-facing signature of a tag handler, introspected once per class."""
+
+    __slots__ = ("params", "varargs", "varkw", "defaults")
+
+    special_params = ["context", "nodelist"]  # Rendering params that aren't given by template
+
+    def __init__(self, handler):
+        _data = getfullargspec(handler)
+        params, varargs, varkw, defaults, _kwonlyargs, _kwonlydefaults, _annotations = _data
+        params = params[1:]  # removes inspected 'self' from required tag arguments
+        self.params = [param for param in params if param not in self.special_params]
+        self.varargs = varargs
+        self.varkw = varkw
+        self.defaults = defaults
+
+
+class HandlerBinding(object):
+    """
+    A handler together with the arguments given to it by the template.  Literal arguments (with no
+    filters) are resolved once at parse time, and held with the ``defaults`` of the arguments not
+    given; only the remaining expressions are resolved on each render.  Bindings are immutable, so
+    that identical tag pieces may share one (see ``BindingCache``).
+    """
+
+    __slots__ = ("name", "constants", "variables")
+
+    def __init__(self, name, arguments=None, defaults=None):
+        self.name = name
+        constants = dict(defaults or ())
+        variables = []
+        for key, value in (arguments or {}).items():
+            if is_constant(value):
+                constants[key] = constant_value(value)
+            else:
+                variables.append((key, value))
+        self.constants = MappingProxyType(constants)
+        self.variables = tuple(variables)
+
+    def resolve(self, context):
+        """Returns the handler's keyword arguments for the given ``context``."""
+        if not self.variables:
+            return self.constants
+        kwargs = self.constants.copy()
+        for key, value in self.variables:
+            kwargs[key] = value.resolve(context)
+        return kwargs
+
+    def __call__(self, node, context, nodelist):
+        handler = getattr(node, self.name)
+        with timed(node.__class__, "handler", self.name):
+            if nodelist is None:
+                return handler(context=context, **self.resolve(context))
+            return handler(context=context, nodelist=nodelist, **self.resolve(context))
+
+
+class Argument(object):
+    """
+    An argument of a tag piece declared by a ``TagSpec``.  A literal value given by a template must
+    be None or an instance of ``types``, if set, which is checked when the template is compiled.
+    """
+
+    __slots__ = ("name", "default", "types")
+
+    REQUIRED = object()
+
+    def __init__(self, name, default=REQUIRED, types=None):
+        self.name = name
+        self.default = default
+        self.types = types
+
+    @property
+    def required(self):
+        return self.default is Argument.REQUIRED
+
+
+class Section(object):
+    """
+    A tag piece of a ``TagSpec`` (the opening tag or an intermediate tag) with its arguments, in
+    positional order, and the name of the handler's ``**kwargs`` if it accepts any others.  It
+    stands in for the ``HandlerSpec`` that would otherwise be introspected from the handler.
+    """
+
+    __slots__ = ("name", "arguments", "varkw", "params", "defaults")
+
+    varargs = None
+
+    def __init__(self, name, arguments=(), varkw=None):
+        self.name = name
+        self.arguments = tuple(arguments)
+        self.varkw = varkw
+        self.params = [argument.name for argument in self.arguments]
+        defaults = []
+        for argument in self.arguments:
+            if not argument.required:
+                defaults.append(argument.default)
+            elif defaults:
+                raise ValueError(
+                    "%s's required argument '%s' follows optional ones" % (name, argument.name)
+                )
+        self.defaults = tuple(defaults) or None
+
+    def parse(self, parser, bits):
+        """
+        Returns the ``HandlerBinding`` of the arguments in ``bits``, raising the same errors as
+        Django's ``parse_bits()`` for unknown, repeated or missing arguments.
+        """
+        arguments = {}
+        positional = 0
+        for bit in bits:
+            key, value = kwarg_re.match(bit).groups()
+            if key is None:
+                if len(arguments) > positional:
+                    raise TemplateSyntaxError(
+                        "'%s' received some positional argument(s) after some keyword "
+                        "argument(s)" % self.name
+                    )
+                if positional >= len(self.params):
+                    raise TemplateSyntaxError(
+                        "'%s' received too many positional arguments" % self.name
+                    )
+                key = self.params[positional]
+                positional += 1
+            elif key not in self.params and self.varkw is None:
+                raise TemplateSyntaxError(
+                    "'%s' received unexpected keyword argument '%s'" % (self.name, key)
+                )
+            elif key in arguments:
+                raise TemplateSyntaxError(
+                    "'%s' received multiple values for keyword argument '%s'" % (self.name, key)
+                )
+            arguments[key] = parser.compile_filter(value)
+
+        defaults = {}
+        missing = []
+        for argument in self.arguments:
+            if argument.name in arguments:
+                continue
+            if argument.required:
+                missing.append("'%s'" % argument.name)
+            else:
+                defaults[argument.name] = argument.default
+        if missing:
+            raise TemplateSyntaxError(
+                "'%s' did not receive value(s) for the argument(s): %s"
+                % (self.name, ", ".join(missing))
+            )
+
+        binding = HandlerBinding(self.name, arguments, defaults)
+        for argument in self.arguments:
+            value = binding.constants.get(argument.name)
+            given = argument.name in arguments and argument.name in binding.constants
+            # None stands for "unset" whatever the argument's type
+            if (
+                argument.types
+                and given
+                and value is not None
+                and not isinstance(value, argument.types)
+            ):
+                raise TemplateSyntaxError(
+                    "'%s' argument '%s' must be %s, not %r"
+                    % (self.name, argument.name, describe_types(argument.types), value)
+                )
+        return binding
+
+
+def describe_types(types):
+    if not isinstance(types, tuple):
+        types = (types,)
+    return " or ".join(t.__name__ for t in types)
+
+
+class TagSpec(object):
+    """
+    Declares a tag: its name, the ``Argument``s of its opening tag, its intermediate tags as
+    ``Section``s, and whether it has an end tag (``end<name>``).  ``templates`` maps the fragment
+    templates the tag renders by key, and ``style_templates`` replaces some of them for a style::
+
+        spec = TagSpec(
+            "bootstrap_alert",
+            arguments=[Argument("level", "info", types=str), Argument("dismissible", False)],
+            templates={"wrapper": "alert/wrapper.html"},
+        )
+
+    An ``EasyTag`` setting ``spec`` gets its ``name``, ``intermediate_tags``, ``end_tag`` and a
+    parser for each tag piece from it, built once.  Its handlers receive every declared argument,
+    defaults included, so they declare no defaults themselves.
+    """
+
+    def __init__(
+        self,
+        name,
+        arguments=(),
+        sections=(),
+        end_tag=True,
+        varkw=None,
+        templates=None,
+        style_templates=None,
+    ):
+        self.name = name
+        self.sections = {name: Section(name, arguments, varkw)}
+        for section in sections:
+            self.sections[section.name] = section
+        self.end_tag = end_tag
+        self.templates = dict(templates or {})
+        self.style_templates = {
+            style: dict(self.templates, **overrides)
+            for style, overrides in (style_templates or {}).items()
+        }
+
+    @property
+    def intermediate_tags(self):
+        return tuple(name for name in self.sections if name != self.name)
+
+    def get_templates(self, style):
+        """Returns the fragment templates to render for ``style``, by key."""
+        return self.style_templates.get(style, self.templates)
+
+    def renamed(self, name):
+        """Returns a copy of the spec for a tag called ``name``, with the same arguments."""
+        spec = copy(self)
+        opening = self.sections[self.name]
+        spec.name = name
+        spec.sections = {name: Section(name, opening.arguments, opening.varkw)}
+        spec.sections.update(
+            (section_name, section)
+            for section_name, section in self.sections.items()
+            if section_name != self.name
+        )
+        return spec
+
+
+DEFAULT_BINDING_CACHE_SIZE = 1024
+
+# Shared by the nodes given none of the generic options
+NO_OPTIONS = MappingProxyType({})
+
+
+class BindingCache(object):
+    """
+    Bounded LRU of the ``HandlerBinding`` parsed for each (tag class, handler name, token contents),
+    so that the tag pieces repeated throughout large templates are parsed once and share their
+    binding and compiled arguments.  Its size is
+    ``settings.BOOTSTRAP_TEMPLATETAGS_PARSE_CACHE_SIZE``.
+
+    Tokens with filters are never cached: which filters are available depends on the libraries
+    the template loads.
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return getattr(
+            settings, "BOOTSTRAP_TEMPLATETAGS_PARSE_CACHE_SIZE", DEFAULT_BINDING_CACHE_SIZE
+        )
+
+    def get_or_parse(self, key, parse):
+        """Returns the binding for ``key``, calling ``parse()`` to create it if needed."""
+        if "|" in key[-1]:
+            return parse()
+        with self._lock:
+            binding = self._data.get(key)
+            if binding is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return binding
+        binding = parse()
+        maxsize = self.maxsize
+        with self._lock:
+            self.misses += 1
+            if maxsize > 0:
+                self._data[key] = binding
+                while len(self._data) > maxsize:
+                    self._data.popitem(last=False)
+        return binding
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+bindings = BindingCache()
 
 
 class EasyTag(Node):
@@ -11,41 +344,107 @@ class EasyTag(Node):
     intermediate_tags = ()
     end_tag = None
 
-    @staticmethod
-    def wrap_handler(handler):
-        """Wraps the ``handler`` to resolve template variables automatically."""
+    # Opening tag arguments handled generically rather than passed to the handler:
+    #   cache=<seconds>: memoizes the tag's whole output in the cache framework
+    #   vary_on=<value or list>: extra values the cached output depends on
+    #   parallel=<threads>: renders the sections' bodies concurrently on a thread pool
+    options = ("cache", "vary_on", "parallel")
 
-        @wraps(handler)
-        def wrapper(context, nodelist, *args, **kwargs):
-            args = [arg.resolve(context) for arg in args]
-            for k, v in kwargs.items():
-                kwargs[k] = v.resolve(context)
-            return handler(context=context, nodelist=nodelist, *args, **kwargs)
+    # A ``TagSpec`` declaring the tag, as an alternative to the attributes above and handler
+    # introspection
+    spec = None
 
-        return wrapper
+    handler_specs = {}
+
+    # Whether the tag's output depends only on its arguments and sections (and ``get_fold_key()``),
+    # so that static invocations may be rendered once and reused; see ``is_static()``
+    foldable = False
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Precomputes the signature of each handler the tag declares, from its ``spec`` if it has
+        one.  A subclass that only renames its parent's tag (and its opening handler) gets a
+        renamed copy of the parent's spec.
+        """
+        super().__init_subclass__(**kwargs)
+        if "name" in cls.__dict__ and "spec" not in cls.__dict__ and cls.spec is not None:
+            if getattr(cls, cls.name, None) in (None, getattr(cls, cls.spec.name, None)):
+                # The parent's tag under another name, e.g. to register it twice
+                cls.spec = cls.spec.renamed(cls.name)
+            else:
+                cls.spec = None  # A different tag, which doesn't inherit its parent's declaration
+        if cls.spec is not None:
+            cls.name = cls.spec.name
+            cls.intermediate_tags = cls.spec.intermediate_tags
+            cls.end_tag = cls.spec.end_tag
+            cls.handler_specs = dict(cls.spec.sections)
+            return
+        cls.handler_specs = {}
+        if cls.name is None:
+            return
+        for name in [cls.name, *cls.intermediate_tags]:
+            handler = getattr(cls, name, None)
+            if callable(handler):
+                cls.handler_specs[name] = HandlerSpec(handler)
+
+    @classmethod
+    def get_handler_spec(cls, name, handler):
+        spec = cls.handler_specs.get(name)
+        if spec is None:
+            spec = cls.handler_specs[name] = HandlerSpec(handler)
+        return spec
 
     @classmethod
     def handler_parser(cls, parser, token, name, handler):
         """
-        Returns a wrapped partial of ``handler`` with the arguments supplied by the calling
-        template.  Errors will bubble up for invalid or missing arguments to the handler.
+        Returns a ``HandlerBinding`` of ``handler`` with the arguments supplied by the calling
+        template, shared by every identical tag piece.  Errors will bubble up for invalid or missing
+        arguments to the handler.
         """
-        _data = getfullargspec(handler)
-        params, varargs, varkw, defaults, _kwonlyargs, _kwonlydefaults, _annotations = _data
-        wrapped = cls.wrap_handler(handler)
-        params.pop(0)  # removes inspected 'self' from required tag arguments
+        spec = cls.get_handler_spec(name, handler)
 
-        special_params = ["context", "nodelist"]  # Rendering params that aren't given by template
-        for param in special_params:
-            if param in params:
-                params.pop(params.index(param))
+        def parse():
+            bits = token.split_contents()[1:]
+            if isinstance(spec, Section):
+                return spec.parse(parser, bits)
+            args, kwargs = parse_bits(
+                parser,
+                bits,
+                spec.params,
+                spec.varargs,
+                spec.varkw,
+                spec.defaults,
+                (),
+                (),
+                None,
+                name,
+            )
+            kwargs.update(zip(spec.params, args))
+            return HandlerBinding(name, kwargs)
 
-        bits = token.split_contents()[1:]
-        args, kwargs = parse_bits(
-            parser, bits, params, varargs, varkw, defaults, (), (), None, name
-        )
-        kwargs.update(zip(params, args))
-        return partial(wrapped, **kwargs)
+        return bindings.get_or_parse((cls, name, token.contents), parse)
+
+    @classmethod
+    def parse_options(cls, parser, token):
+        """
+        Removes the generic ``options`` from the opening tag, returning the remaining token and a
+        dict of the options' compiled values.  Arguments that the opening handler itself declares
+        are left alone.
+        """
+        spec = cls.handler_specs.get(cls.name)
+        bits = token.split_contents()
+        remaining = bits[:1]
+        options = {}
+        for bit in bits[1:]:
+            key, sep, value = bit.partition("=")
+            if sep and key in cls.options and not (spec and key in spec.params):
+                options[key] = parser.compile_filter(value)
+            else:
+                remaining.append(bit)
+        if not options:
+            return token, NO_OPTIONS
+        token = Token(token.token_type, " ".join(remaining), token.position, token.lineno)
+        return token, options
 
     @classmethod
     def parser(cls, parser, token):
@@ -54,6 +453,7 @@ class EasyTag(Node):
             raise ValueError("%r tag should define attribute 'name'" % cls.__name__)
 
         node = cls()
+        token, node.options = cls.parse_options(parser, token)
 
         # Detect if an end tag or intermediate tags will appear.
         if cls.end_tag:
@@ -68,25 +468,22 @@ class EasyTag(Node):
             parse_until.append(end_tag)
         else:
             end_tag = None
+            parse_until = []
 
         # Get the base handler, named after the tag itself.
-        _handler = cls.handler_parser(  # noqa: F841
+        nodelist_handler = cls.handler_parser(
             parser, token, cls.name, handler=getattr(node, cls.name)
         )
         current_name = cls.name
 
         # Parse each nodelist and associate it with the tag piece that came just above it.
         nodelists = []
+        if not parse_until:
+            # A tag without an end tag is just its opening handler, which takes no nodelist.
+            nodelists.append((nodelist_handler, None))
         stop = len(parse_until) == 0
         while not stop:
             nodelist = parser.parse(parse_until)
-            nodelist_name = current_name  # noqa: F841
-
-            # Fetch the handler for this nodelist
-            nodelist_handler = getattr(node, current_name)
-            # if isinstance(handler, template.Node):
-            #     handler = handler.__init__
-            nodelist_handler = cls.handler_parser(parser, token, current_name, nodelist_handler)
             nodelists.append((nodelist_handler, nodelist))
 
             # Advance the 'current_name' to the newly encountered intermediate tag name
@@ -96,11 +493,18 @@ class EasyTag(Node):
             # If this is the end, queue the optional endtoken handler.
             if token.contents == end_tag:
                 stop = True
-                endtoken_handler = getattr(node, token.contents, None)
-                if endtoken_handler:
-                    nodelists.append((endtoken_handler, None))
+                if callable(getattr(node, token.contents, None)):
+                    nodelists.append((HandlerBinding(token.contents), None))
+            else:
+                # Fetch the handler for the nodelist that follows this intermediate tag
+                nodelist_handler = cls.handler_parser(
+                    parser, token, current_name, getattr(node, current_name)
+                )
 
-        node.nodelists = nodelists
+        node.nodelists = tuple(nodelists)
+        node.validate()
+        if node.is_static():
+            node.static = True
         return node
 
     @classmethod
@@ -108,15 +512,304 @@ class EasyTag(Node):
         """Registers this tag's compiler to the target ``library``."""
         return library.tag(cls.name, cls.parser)
 
+    # Per-node state.  Node has no __slots__ (and the parser sets ``token`` and ``origin`` on every
+    # node), so nodes keep a __dict__; values that are usually unset are class defaults instead.
+    static = False
+    folded = None  # The output of a static tag, by ``get_fold_key()``, once rendered
+    source_digest = None  # See ``get_source_digest()``, once computed
+
     def __init__(self):
-        pass
+        self.options = NO_OPTIONS
+
+    def validate(self):
+        """
+        Compile-time hook, called once the whole tag is parsed, for checking the literal arguments
+        found in ``self.nodelists`` bindings' ``constants``.  Raise ``TemplateSyntaxError`` to
+        report an error at the tag's location in the template.
+        """
+
+    def get_constant_option(self, name, default=None):
+        """Returns the value of option ``name`` if it is given as a literal, else ``default``."""
+        value = self.options.get(name)
+        if value is None or not is_constant(value):
+            return default
+        return constant_value(value)
+
+    def is_static(self):
+        """
+        Returns whether the tag renders the same output every time: all of its arguments and options
+        are literals, and its sections contain only text and other static tags.  Static tags render
+        once for each ``get_fold_key()`` and then reuse that output.
+        """
+        if not self.foldable:
+            return False
+        if not all(is_constant(value) for value in self.options.values()):
+            return False
+        for binding, nodelist in self.nodelists:
+            if binding.variables:
+                return False
+            for node in nodelist or ():
+                if not isinstance(node, TextNode) and not getattr(node, "static", False):
+                    return False
+        return True
+
+    def get_fold_key(self, context):
+        """
+        Returns the key under which the output of a static tag is kept: whatever besides its own
+        arguments the output depends on.
+        """
+        return None
+
+    def render_annotated(self, context):
+        """Renders the node as a string; see ``render_annotated_segments()``."""
+        return self.render_annotated_segments(context).flatten()
+
+    def render_annotated_segments(self, context):
+        """
+        Renders the node as ``Segments``, which an enclosing tag can carry along without joining,
+        restoring afterwards whatever per-render state an enclosing render of this same node (e.g.,
+        through a recursive include) had stored in the render_context.
+        """
+        with self.preserved_state(context), timed(self.__class__, "tag", self.name):
+            if self.static:
+                return Segments([self.render_folded(context)])
+
+            timeout = self.get_cache_timeout(context)
+            if not timeout:
+                return self.render_parallel_segments(context)
+
+            key = cache.make_key(self.name, self.get_cache_key_parts(context))
+            content = cache.get_or_render(
+                key, timeout, lambda: self.render_parallel_segments(context).flatten()
+            )
+            return Segments([content])
+
+    def get_integer_option(self, context, name):
+        """
+        Returns the value of option ``name`` as an integer, or None if it is not given or resolves
+        to a false value.  Like Django's ``{% cache %}`` timeout, a value that is not an integer
+        raises ``TemplateSyntaxError``.
+        """
+        value = self.options[name].resolve(context) if name in self.options else None
+        if not value:
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise TemplateSyntaxError(
+                "'%s' option '%s' must be an integer, not %r" % (self.name, name, value)
+            )
+
+    def get_cache_timeout(self, context):
+        """Returns the number of seconds to cache the output for, or None not to cache it."""
+        return self.get_integer_option(context, "cache")
+
+    def render_parallel_segments(self, context):
+        """
+        Calls ``render_debug_segments()``.  With the ``parallel`` option, the handlers still run one
+        after the other, so counters and active sections are assigned as usual, but the sections'
+        bodies are deferred and then rendered on a pool of that many threads, each with its own
+        copy of the context.
+        """
+        workers = self.get_integer_option(context, "parallel")
+        if workers is not None and workers < 0:
+            raise TemplateSyntaxError(
+                "'%s' option 'parallel' must not be negative, got %r" % (self.name, workers)
+            )
+        if not workers or workers < 2 or parallel.in_worker():
+            return self.render_debug_segments(context)
+
+        with self.deferring(context) as deferred:
+            segments = self.render_debug_segments(context)
+        parallel.render_deferred(deferred, workers)
+        return segments.resolve()
+
+    def render_folded(self, context):
+        """Returns the output of a static tag, rendering it only the first time for its key."""
+        content = self.folded.get(self.get_fold_key(context)) if self.folded else None
+        if content is None:
+            content = self.render_debug_segments(context).flatten()
+            if self.folded is None or len(self.folded) >= 8:
+                self.folded = {}
+            # The key is read again, in case rendering itself changed what it depends on
+            self.folded[self.get_fold_key(context)] = content
+        return content
+
+    def render_debug_segments(self, context):
+        """
+        Calls ``render_segments()``, annotating exceptions with their location in the template
+        while debugging, as ``Node.render_annotated()`` does.
+        """
+        try:
+            if type(self).render is not EasyTag.render:
+                # A subclass customizing render() itself rather than render_segments()
+                return Segments().add(self.render(context))
+            return self.render_segments(context)
+        except Exception as e:
+            if context.template.engine.debug:
+                if not hasattr(e, "_culprit_node"):
+                    e._culprit_node = self
+                template = context.render_context.template
+                if not hasattr(e, "template_debug") and template.origin == e._culprit_node.origin:
+                    e.template_debug = template.get_exception_info(e, e._culprit_node.token)
+            raise
+
+    def get_cache_key_parts(self, context):
+        """
+        Returns the values that identify this tag's output for ``cache=``: its location in the
+        template and its source, every handler's resolved arguments and the resolved ``vary_on``
+        values.
+        """
+        origin = getattr(self, "origin", None)
+        token = getattr(self, "token", None)
+        parts = [
+            getattr(origin, "name", None),
+            getattr(token, "position", None),
+            self.get_source_digest(),
+        ]
+        for binding, _nodelist in self.nodelists:
+            parts.append(binding.name)
+            parts.extend(sorted(binding.resolve(context).items()))
+        if "vary_on" in self.options:
+            vary_on = self.options["vary_on"].resolve(context)
+            if isinstance(vary_on, (list, tuple)):
+                parts.extend(vary_on)
+            else:
+                parts.append(vary_on)
+        return parts
+
+    def get_source_digest(self):
+        """
+        Returns a digest of the tag's source, i.e. the tokens of the tag and of every node within
+        its sections.  Templates compiled from strings share a single origin name, so the location
+        of a tag alone does not tell it from a tag at the same place in another template.
+        """
+        if self.source_digest is None:
+            digest = hashlib.md5(usedforsecurity=False)
+            tokens = [getattr(self, "token", None)]
+            for binding, nodelist in self.nodelists:
+                tokens.append(binding.name)
+                for node in nodelist.get_nodes_by_type(Node) if nodelist else ():
+                    tokens.append(getattr(node, "token", None))
+            for token in tokens:
+                contents = getattr(token, "contents", token)
+                digest.update(cache.encode_part((getattr(token, "token_type", None), contents)))
+            self.source_digest = digest.hexdigest()
+        return self.source_digest
+
+    @contextmanager
+    def preserved_state(self, context):
+        previous = context.render_context.get(self)
+        try:
+            yield
+        finally:
+            if previous is None:
+                context.render_context.dicts[-1].pop(self, None)
+            else:
+                context.render_context[self] = previous
+
+    def get_nodes_by_type(self, nodetype):
+        """Returns this node and any nodes of ``nodetype`` found in its sections' nodelists."""
+        nodes = [self] if isinstance(self, nodetype) else []
+        for _binding, nodelist in self.nodelists:
+            if nodelist:
+                nodes.extend(nodelist.get_nodes_by_type(nodetype))
+        return nodes
+
+    def render_section(self, context, index):
+        """Renders only the nodelist that follows the tag piece at ``nodelists[index]``."""
+        return self.nodelists[index][1].render(context)
+
+    def stream(self, context):
+        """
+        Yields the rendered output in chunks.  Tags that can emit their output progressively
+        override this; by default the whole output is a single chunk.
+        """
+        yield self.render_annotated(context)
+
+    def is_cached(self):
+        """Returns whether the tag's output is reused rather than rendered progressively."""
+        return self.static or "cache" in self.options
+
+    def render_nodelist(self, nodelist, context):
+        """
+        Renders a section's ``nodelist`` as ``Segments``, keeping nested tags' output unjoined.
+        While the tag is rendered by ``arender()``, the nodelist is instead rendered later, on its
+        own copy of the context, and a ``Deferred`` placeholder is returned.
+        """
+        key = (self, Deferred)
+        deferred = context.render_context.get(key)
+        if deferred is None:
+            return render_nodelist(nodelist, context)
+
+        body_context = copy(context)
+        body_context.push()
+        state = dict(body_context.render_context.dicts[-1])
+        del state[key]
+        body_context.render_context.push(state)
+        # The active language and time zone are per thread, so they're carried to the worker
+        language = translation.get_language()
+        current_timezone = timezone.get_current_timezone()
+
+        def render():
+            with translation.override(language), timezone.override(current_timezone):
+                return render_nodelist(nodelist, body_context).flatten()
+
+        body = Deferred(render)
+        deferred.append(body)
+        return Segments([body])
+
+    @contextmanager
+    def deferring(self, context):
+        """
+        Makes ``render_nodelist()`` defer the bodies of this tag's sections while in use, yielding
+        the list that collects the ``Deferred`` bodies.
+        """
+        key = (self, Deferred)
+        deferred = context.render_context[key] = []
+        try:
+            yield deferred
+        finally:
+            context.render_context.dicts[-1].pop(key, None)
+
+    async def arender(self, context):
+        """
+        Renders the tag like ``render_annotated()``, but renders the bodies of its sections
+        concurrently, each in a worker thread with its own copy of the context, so that bodies
+        waiting on I/O (e.g., evaluating querysets) overlap.  The handlers still run one after the
+        other, so counters and active sections behave as usual, and the bodies are put back in
+        their original places.
+
+        Bodies must not depend on each other's side effects on the context.
+        """
+        if self.is_cached():
+            return await sync_to_async(self.render_annotated)(context)
+
+        def render():
+            with self.deferring(context) as deferred:
+                return self.render_annotated_segments(context), deferred
+
+        segments, deferred = await sync_to_async(render)()
+        contents = await asyncio.gather(
+            *[
+                sync_to_async(parallel.render_body, thread_sensitive=False)(body)
+                for body in deferred
+            ]
+        )
+        for body, content in zip(deferred, contents):
+            body.content = content
+        return segments.resolve().flatten()
+
+    def render_segments(self, context):
+        """
+        Calls each handler with its associated nodelist, returning their output as ``Segments``.
+        Handlers may return strings or ``Segments``.
+        """
+        segments = Segments()
+        for binding, nodelist in self.nodelists:
+            segments.add(binding(self, context, nodelist))
+        return segments
 
     def render(self, context):
         """Calls each handler with its associated nodelist, returning their joined strings."""
-        content = []
-        for handler, nodelist in self.nodelists:
-            kwargs = {"context": context}
-            if nodelist is not None:
-                kwargs["nodelist"] = nodelist
-            content.append(handler(**kwargs))
-        return str("".join(map(str, content)))
+        return self.render_segments(context).flatten()
@@ -1,6 +1,57 @@
 # -*- coding: utf-8 -*-
-from django.template import Context, Template
-from django.test import SimpleTestCase
+import os
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock, skipIf
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template import Context, Engine, Library, Template, TemplateSyntaxError, engines
+from django.template.loader import get_template
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils import translation
+from django.utils.safestring import mark_safe
+
+try:
+    import jinja2
+except ImportError:  # Jinja2 is optional
+    jinja2 = None
+
+from bootstrap_templatetags import cache, instrumentation, lazy, native
+from bootstrap_templatetags.components import (
+    Accordion,
+    Carousel,
+    Dropdown,
+    ListGroup,
+    Modal,
+    NavTabs,
+    Tab,
+    render_accordion_from,
+    render_navtabs_from,
+)
+from bootstrap_templatetags.fragments import fragments
+from bootstrap_templatetags.instrumentation import TimingCollector
+from bootstrap_templatetags.segments import Segments
+from bootstrap_templatetags.streaming import arender_template, stream_template
+from bootstrap_templatetags.styles import MODAL_SIZE, StylePack, styles
+from bootstrap_templatetags.warmup import get_fragment_names, warmup
+from bootstrap_templatetags.templatetags.bootstrap_tags import (
+    BaseBootstrapTag,
+    BootstrapAccordion,
+    BootstrapAccordionFrom,
+    BootstrapNavTabs,
+    RenderState,
+)
+from bootstrap_templatetags.templatetags.easytag import Argument, EasyTag, Section, TagSpec
 
 
 class BootstrapTemplateTagTest(SimpleTestCase):
@@ -49,3 +100,1502 @@ class BootstrapTemplateTagTest(SimpleTestCase):
             'data-parent="#my_accordion" class="accordion-toggle">',
             rendered_template,
         )
+
+
+class FragmentRegistryTest(SimpleTestCase):
+    template = """
+        {% load bootstrap_tags %}
+        {% bootstrap_accordion id="my_accordion" %}
+            {% panel heading="First heading" %}
+                First panel content
+            {% panel heading="Second heading" %}
+                Second panel {{ content }}
+        {% endbootstrap_accordion %}
+        """
+
+    def setUp(self):
+        fragments.clear()
+
+    def test_fragments_resolved_once(self):
+        template = Template(self.template)
+        first = template.render(Context())
+        self.assertEqual(fragments.stats(), {"hits": 8, "misses": 4, "size": 4})
+
+        second = template.render(Context())
+        self.assertEqual(first, second)
+        self.assertEqual(fragments.stats(), {"hits": 20, "misses": 4, "size": 4})
+
+    def test_keyed_by_style(self):
+        bootstrap2 = fragments.get("bootstrap2", "accordion/wrapper.html")
+        bootstrap3 = fragments.get("bootstrap3", "accordion/wrapper.html")
+        self.assertIsNot(bootstrap2, bootstrap3)
+        self.assertIs(bootstrap3, fragments.get("bootstrap3", "accordion/wrapper.html"))
+        self.assertEqual(fragments.stats(), {"hits": 1, "misses": 2, "size": 2})
+
+    def test_stale_fragment_reloaded_in_debug(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bootstrap3", "accordion", "wrapper.html")
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write('<div id="{{ id }}">{{ content }}</div>')
+
+            templates = [
+                {
+                    "BACKEND": "django.template.backends.django.DjangoTemplates",
+                    "DIRS": [directory],
+                    "APP_DIRS": True,
+                }
+            ]
+            with self.settings(TEMPLATES=templates, DEBUG=True):
+                fragment = fragments.get("bootstrap3", "accordion/wrapper.html")
+                rendered = fragment.render({"id": "a", "content": "x"})
+                self.assertEqual(rendered, '<div id="a">x</div>')
+
+                with open(path, "w") as f:
+                    f.write('<section id="{{ id }}">{{ content }}</section>')
+                os.utime(path, ns=(fragment.mtime + 10**9, fragment.mtime + 10**9))
+
+                fragment = fragments.get("bootstrap3", "accordion/wrapper.html")
+                self.assertEqual(
+                    fragment.render({"id": "a", "content": "x"}), '<section id="a">x</section>'
+                )
+                self.assertEqual(fragments.misses, 2)
+
+    def test_overridden_slot_rendered_with_content(self):
+        sources = {
+            "bootstrap3/accordion/body.html": (
+                "<div>{% if body %}{{ body|linebreaksbr }}{% else %}EMPTY{% endif %}</div>"
+            ),
+        }
+        templates = [
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "OPTIONS": {
+                    "loaders": [
+                        ("django.template.loaders.locmem.Loader", sources),
+                        "django.template.loaders.app_directories.Loader",
+                    ]
+                },
+            }
+        ]
+        with self.settings(TEMPLATES=templates):
+            accordion = Accordion("a", style_version="bootstrap3")
+            accordion.panel("First", "line1\nline2").panel("Second", "")
+            rendered = accordion.render()
+            self.assertIn("<div>line1<br>line2</div>", rendered)
+            self.assertIn("<div>EMPTY</div>", rendered)
+            self.assertFalse(
+                fragments.get("bootstrap3", "accordion/body.html").has_plain_slot("body")
+            )
+            self.assertTrue(
+                fragments.get("bootstrap3", "accordion/panel.html").has_plain_slot("panel_body")
+            )
+
+
+class NativeRendererTest(SimpleTestCase):
+    contexts = [
+        {},
+        {
+            "id": "my_accordion",
+            "i": 2,
+            "active": "in",
+            "heading": "Fish & <Chips>",
+            "body": mark_safe("<p>Body</p>"),
+            "content": mark_safe("<p>Content</p>"),
+            "panel_heading": mark_safe("<h1>Heading</h1>"),
+            "panel_body": "<unsafe body>",
+            "style": "primary",
+            "use_title": "h3",
+            "label": "Tab's label",
+            "tab_id": "tab-1",
+            "data_attrs": mark_safe(' data-x="1"'),
+        },
+        {"id": None, "i": 1000, "use_title": False, "heading": mark_safe("<b>Safe</b>")},
+    ]
+
+    templates = [
+        """
+        {% load bootstrap_tags %}
+        {% bootstrap_accordion id="my_accordion" style="primary" active_panel=2 use_title="h2" %}
+            {% panel heading="First heading" %}
+                {{ title }}
+            {% panel heading=title style="danger" %}
+                Second panel content
+        {% endbootstrap_accordion %}
+        """,
+        """
+        {% load bootstrap_tags %}
+        {% bootstrap_navtabs active_tab=2 %}
+            {% tab label="First" %}
+                {{ title }}
+            {% tab label="Second" show=False %}
+                Hidden
+            {% tab label=title id="third" %}
+                Third panel content
+        {% endbootstrap_navtabs %}
+        """,
+    ]
+
+    def test_fragment_equivalence(self):
+        for (style, name), renderer in native.renderers.items():
+            template = fragments.get(style, name).template
+            for context in self.contexts:
+                with self.subTest(style=style, name=name, context=context):
+                    self.assertEqual(renderer(context), template.render(context))
+
+    def test_tag_equivalence(self):
+        context = {"title": "<my_title>"}
+        for source in self.templates:
+            with self.settings(BOOTSTRAP_TEMPLATETAGS_COMPILED=False):
+                expected = Template(source).render(Context(context))
+            with self.settings(BOOTSTRAP_TEMPLATETAGS_COMPILED=True):
+                self.assertIsNotNone(fragments.get("bootstrap3", "accordion/panel.html").native)
+                self.assertEqual(Template(source).render(Context(context)), expected)
+
+    def test_overridden_template_falls_back(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bootstrap3", "navtabs", "wrapper.html")
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write('<ul class="nav nav-pills">{{ content }}</ul>')
+
+            templates = [
+                {
+                    "BACKEND": "django.template.backends.django.DjangoTemplates",
+                    "DIRS": [directory],
+                    "APP_DIRS": True,
+                }
+            ]
+            with self.settings(TEMPLATES=templates, BOOTSTRAP_TEMPLATETAGS_COMPILED=True):
+                self.assertIsNone(fragments.get("bootstrap3", "navtabs/wrapper.html").native)
+                self.assertIsNotNone(fragments.get("bootstrap3", "navtabs/tab.html").native)
+                rendered = Template(self.templates[1]).render(Context())
+                self.assertIn('<ul class="nav nav-pills">', rendered)
+
+
+class ConcurrentRenderTest(SimpleTestCase):
+    template = """
+        {% load bootstrap_tags %}
+        {% bootstrap_accordion id=accordion_id active_panel=active %}
+            {% panel heading="First heading" %}
+                {% bootstrap_navtabs active_tab=active %}
+                    {% tab label="First" %}{{ accordion_id }}
+                    {% tab label="Second" show=False %}Hidden
+                    {% tab label="Third" %}{{ active }}
+                {% endbootstrap_navtabs %}
+            {% panel heading="Second heading" %}
+                {{ accordion_id }}
+            {% panel heading="Third heading" %}
+                {{ active }}
+        {% endbootstrap_accordion %}
+        """
+
+    def test_threads_share_compiled_template(self):
+        template = Template(self.template)
+        parameters = [("accordion-%d" % n, n % 4) for n in range(16)]
+        expected = {
+            p: template.render(Context({"accordion_id": p[0], "active": p[1]})) for p in parameters
+        }
+        self.assertEqual(len(set(expected.values())), len(parameters))
+
+        barrier = threading.Barrier(len(parameters))
+
+        def render(accordion_id, active):
+            barrier.wait()
+            return [
+                template.render(Context({"accordion_id": accordion_id, "active": active}))
+                for _ in range(25)
+            ]
+
+        with ThreadPoolExecutor(max_workers=len(parameters)) as executor:
+            futures = {p: executor.submit(render, *p) for p in parameters}
+            for p, future in futures.items():
+                for rendered in future.result():
+                    self.assertEqual(rendered, expected[p])
+
+    def test_node_state_not_stored_on_node(self):
+        template = Template(self.template)
+        template.render(Context({"accordion_id": "a", "active": 1}))
+        for node in template.nodelist.get_nodes_by_type(EasyTag):
+            self.assertFalse({"id", "active_index", "global_style", "use_title"} & set(vars(node)))
+
+    def test_repeated_render_in_loop(self):
+        template = Template(
+            """
+            {% load bootstrap_tags %}
+            {% for accordion_id in ids %}
+                {% bootstrap_accordion id=accordion_id %}
+                    {% panel heading="First heading" %}One
+                    {% panel heading="Second heading" %}Two
+                {% endbootstrap_accordion %}
+            {% endfor %}
+            """
+        )
+        rendered = template.render(Context({"ids": ["a", "b"]}))
+        self.assertIn('id="b-panel-1" class="panel-collapse collapse in"', rendered)
+        self.assertNotIn("b-panel-3", rendered)
+
+
+class StreamingNavTabsTest(SimpleTestCase):
+    template = """
+        {% load bootstrap_tags %}
+        <h1>{{ title }}</h1>
+        {% bootstrap_navtabs active_tab=2 %}
+            {% tab label="First" %}{{ body }}
+            {% tab label="Second" show=False %}{{ body }}
+            {% tab label="Third" %}{{ body }}{{ title }}
+        {% endbootstrap_navtabs %}
+        """
+
+    def test_stream_matches_render(self):
+        template = Template(self.template)
+        context = {"title": "Report", "body": "<p>Body</p>"}
+        chunks = list(stream_template(template, context))
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual("".join(chunks), template.render(Context(context)))
+
+    def test_streaming_response(self):
+        template = engines["django"].from_string(self.template)
+        response = StreamingHttpResponse(stream_template(template, {"title": "Report"}))
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content, template.render({"title": "Report"}))
+
+    def test_peak_allocation(self):
+        tabs = "".join('{%% tab label="Tab %d" %%}{{ body }}' % i for i in range(40))
+        template = Template(
+            "{% load bootstrap_tags %}{% bootstrap_navtabs %}" + tabs + "{% endbootstrap_navtabs %}"
+        )
+        context = {"body": "x" * 100000}
+
+        def peak(function):
+            tracemalloc.start()
+            try:
+                function()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        def consume():
+            for chunk in stream_template(template, context):
+                pass
+
+        buffered = peak(lambda: template.render(Context(context)))
+        streamed = peak(consume)
+        self.assertLess(streamed * 10, buffered)
+
+
+class HandlerSpecTest(SimpleTestCase):
+    def test_specs_precomputed(self):
+        specs = BootstrapAccordion.handler_specs
+        self.assertEqual(set(specs), {"bootstrap_accordion", "group", "panel"})
+        self.assertEqual(specs["bootstrap_accordion"].params[:3], ["id", "active_panel", "style"])
+        self.assertEqual(specs["panel"].params, ["heading", "style"])
+        self.assertEqual(BootstrapNavTabs.handler_specs["tab"].varkw, "data_attrs")
+
+    def test_parse_does_not_introspect(self):
+        with mock.patch("bootstrap_templatetags.templatetags.easytag.getfullargspec") as spec:
+            Template(FragmentRegistryTest.template)
+        spec.assert_not_called()
+
+
+class HandlerBindingTest(SimpleTestCase):
+    def test_literal_arguments_resolved_at_parse_time(self):
+        template = Template(
+            """
+            {% load bootstrap_tags %}
+            {% bootstrap_accordion id="my_accordion" active_panel=active %}
+                {% panel heading="First heading" %}One
+                {% panel heading=title|upper %}Two
+            {% endbootstrap_accordion %}
+            """
+        )
+        node = template.nodelist.get_nodes_by_type(BootstrapAccordion)[0]
+        (opening, _), (first, _), (second, _) = node.nodelists
+
+        # The declared defaults of the arguments not given are constants too
+        defaults = {"style": "default", "use_title": False, "lazy": False, "lazy_context": None}
+        self.assertEqual(opening.constants, dict(defaults, id="my_accordion"))
+        self.assertEqual([key for key, value in opening.variables], ["active_panel"])
+        self.assertEqual(first.constants, {"heading": "First heading", "style": None})
+        self.assertEqual(first.variables, ())
+        self.assertEqual(second.constants, {"style": None})
+
+        context = Context({"active": 2, "title": "second"})
+        self.assertIs(first.resolve(context), first.constants)
+        self.assertEqual(second.resolve(context), {"heading": "SECOND", "style": None})
+        self.assertIn("SECOND", template.render(context))
+
+    def test_identical_pieces_share_bindings(self):
+        source = (
+            '{% load bootstrap_tags %}{% bootstrap_accordion id="a" %}'
+            + '{% panel heading="Same" %}{{ x }}{% panel heading=title|upper %}' * 50
+            + "{% endbootstrap_accordion %}"
+        )
+        node = Template(source).nodelist.get_nodes_by_type(BootstrapAccordion)[0]
+        other = Template(source).nodelist.get_nodes_by_type(BootstrapAccordion)[0]
+        same = {id(binding) for binding, _ in node.nodelists[1::2] + other.nodelists[1::2]}
+        filtered = {id(binding) for binding, _ in node.nodelists[2::2]}
+        self.assertEqual(len(same), 1)
+        self.assertEqual(len(filtered), 50)
+        with self.assertRaises(TypeError):
+            node.nodelists[1][0].constants["heading"] = "Changed"
+
+    def test_shared_bindings_reduce_template_memory(self):
+        source = (
+            '{% load bootstrap_tags %}{% bootstrap_accordion id="a" %}'
+            + "".join('{%% panel heading="Heading" %%}Body %d' % i for i in range(200))
+            + "{% endbootstrap_accordion %}"
+        )
+
+        def retained():
+            Template(source)
+            tracemalloc.start()
+            try:
+                template = Template(source)  # noqa: F841
+                return tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+        with self.settings(BOOTSTRAP_TEMPLATETAGS_PARSE_CACHE_SIZE=0):
+            uncached = retained()
+        cached = retained()
+        self.assertLess(cached, uncached * 0.75)
+
+
+class FragmentCacheTest(SimpleTestCase):
+    template = """
+        {% load bootstrap_tags %}
+        {% bootstrap_accordion id=accordion_id cache=300 vary_on=user %}
+            {% panel heading="First heading" %}{{ counter }}
+            {% panel heading="Second heading" %}Static
+        {% endbootstrap_accordion %}
+        """
+
+    def setUp(self):
+        caches["default"].clear()
+        cache.local_cache.clear()
+
+    def render(self, template, **context):
+        calls = []
+        context["counter"] = lambda: calls.append(1) or len(calls)
+        return template.render(Context(context)), len(calls)
+
+    def test_output_memoized(self):
+        template = Template(self.template)
+        first, calls = self.render(template, accordion_id="a", user="u1")
+        self.assertEqual(calls, 1)
+        second, calls = self.render(template, accordion_id="a", user="u1")
+        self.assertEqual(calls, 0)
+        self.assertEqual(first, second)
+
+    def test_keyed_on_arguments_and_vary_on(self):
+        template = Template(self.template)
+        self.render(template, accordion_id="a", user="u1")
+        rendered, calls = self.render(template, accordion_id="b", user="u1")
+        self.assertEqual(calls, 1)
+        self.assertIn('id="b"', rendered)
+        rendered, calls = self.render(template, accordion_id="a", user="u2")
+        self.assertEqual(calls, 1)
+        self.assertEqual(len(cache.local_cache), 3)
+
+    def test_local_tier_bounded_and_checked_first(self):
+        template = Template(self.template)
+        with self.settings(BOOTSTRAP_TEMPLATETAGS_CACHE_LRU_SIZE=2):
+            for user in ["u1", "u2", "u3"]:
+                self.render(template, accordion_id="a", user=user)
+            self.assertEqual(len(cache.local_cache), 2)
+
+            with mock.patch.object(cache, "get_backend") as get_backend:
+                self.render(template, accordion_id="a", user="u3")
+                get_backend.assert_not_called()
+
+            # Evicted from the local tier, but still served by the backend
+            rendered, calls = self.render(template, accordion_id="a", user="u1")
+            self.assertEqual(calls, 0)
+
+    def test_disabled_by_falsy_timeout(self):
+        template = Template(self.template.replace("cache=300", "cache=timeout"))
+        self.render(template, accordion_id="a", user="u1", timeout=0)
+        rendered, calls = self.render(template, accordion_id="a", user="u1", timeout=0)
+        self.assertEqual(calls, 1)
+        self.assertEqual(len(cache.local_cache), 0)
+
+    def test_timeout_coerced(self):
+        template = Template(self.template.replace("cache=300", "cache=timeout"))
+        self.render(template, accordion_id="a", user="u1", timeout="60")
+        rendered, calls = self.render(template, accordion_id="a", user="u1", timeout="60")
+        self.assertEqual(calls, 0)
+        with self.assertRaisesMessage(TemplateSyntaxError, "option 'cache' must be an integer"):
+            self.render(template, accordion_id="a", user="u1", timeout="soon")
+
+    def test_keys_unambiguous(self):
+        self.assertNotEqual(cache.make_key("tag", [["a:b"]]), cache.make_key("tag", [["a", "b"]]))
+        self.assertNotEqual(
+            cache.make_key("tag", [NamedValue("same", 1)]),
+            cache.make_key("tag", [NamedValue("same", 2)]),
+        )
+        self.assertEqual(
+            cache.make_key("tag", ["a", mark_safe("b")]), cache.make_key("tag", ["a", "b"])
+        )
+        with self.assertRaises(ValueError):
+            cache.make_key("tag", [lambda: None])
+
+    def test_keyed_on_template_source(self):
+        first = Template(self.template)
+        second = Template(self.template.replace("Static", "Other"))
+        self.render(first, accordion_id="a", user="u1")
+        rendered, calls = self.render(second, accordion_id="a", user="u1")
+        self.assertEqual(calls, 1)
+        self.assertIn("Other", rendered)
+
+
+LAZY_TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "APP_DIRS": False,
+        "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.locmem.Loader",
+                    {
+                        "lazy_accordion.html": """
+                            {% load bootstrap_tags %}
+                            {% bootstrap_accordion id="lazy" lazy=True lazy_context="name" %}
+                                {% panel heading="First" %}First {{ name }}
+                                {% panel heading="Second" %}Second {{ name }} {{ counter }}
+                                {% panel heading="Third" %}Third {{ name }}
+                            {% endbootstrap_accordion %}
+                            """,
+                        "lazy_cached.html": """
+                            {% load bootstrap_tags %}
+                            {% bootstrap_accordion id="c" cache=300 lazy=True lazy_context="secret" %}
+                                {% panel heading="First" %}First
+                                {% panel heading="Second" %}Second {{ secret }}
+                            {% endbootstrap_accordion %}
+                            """,
+                        "lazy_navtabs.html": """
+                            {% load bootstrap_tags %}
+                            {% bootstrap_navtabs active_tab=2 lazy=True lazy_context="name" %}
+                                {% tab label="First" %}First {{ name }} {{ counter }}
+                                {% tab label="Second" %}Second {{ name }}
+                                {% tab label="Third" lazy=False %}Third {{ name }}
+                                {% tab label="Fourth" %}Fourth {{ name }}
+                            {% endbootstrap_navtabs %}
+                            """,
+                    },
+                ),
+                "django.template.loaders.app_directories.Loader",
+            ],
+        },
+    }
+]
+
+
+@override_settings(TEMPLATES=LAZY_TEMPLATES)
+class LazyAccordionTest(SimpleTestCase):
+    def render(self, template_name, **context):
+        calls = []
+        context["counter"] = lambda: calls.append(1) or "called"
+        return get_template(template_name).render(context), len(calls)
+
+    def test_only_active_panel_rendered(self):
+        rendered, calls = self.render("lazy_accordion.html", name="Lazy")
+        self.assertEqual(calls, 0)
+        self.assertIn("First Lazy", rendered)
+        self.assertNotIn("Second Lazy", rendered)
+        self.assertNotIn("Third Lazy", rendered)
+        self.assertEqual(rendered.count('class="bootstrap-lazy"'), 2)
+
+    def test_placeholder_url_renders_body(self):
+        rendered, calls = self.render("lazy_accordion.html", name="Lazy")
+        urls = re.findall(r'data-url="([^"]+)"', rendered)
+        self.assertEqual(len(urls), 2)
+
+        response = self.client.get(urls[1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().strip(), "Third Lazy")
+
+    def test_tampered_url(self):
+        rendered, calls = self.render("lazy_accordion.html", name="Lazy")
+        url = re.findall(r'data-url="([^"]+)"', rendered)[0]
+        response = self.client.get(url.replace("/lazy/", "/lazy/x"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_expired_url(self):
+        with mock.patch("django.core.signing.time.time", return_value=time.time() - 2 * 86400):
+            rendered, calls = self.render("lazy_accordion.html", name="Lazy")
+        url = re.findall(r'data-url="([^"]+)"', rendered)[0]
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.settings(BOOTSTRAP_TEMPLATETAGS_LAZY_MAX_AGE=None):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_cached_output_varies_on_lazy_context(self):
+        caches["default"].clear()
+        cache.local_cache.clear()
+        payloads = []
+        for secret in ["alice-token", "bob-token"]:
+            rendered, calls = self.render("lazy_cached.html", secret=secret)
+            url = re.findall(r'data-url="([^"]+)"', rendered)[0]
+            payloads.append(lazy.load(url.rstrip("/").rsplit("/", 1)[-1])["c"])
+        self.assertEqual(payloads, [{"secret": "alice-token"}, {"secret": "bob-token"}])
+
+        node = get_template("lazy_cached.html").template.nodelist.get_nodes_by_type(EasyTag)[0]
+        with self.settings(BOOTSTRAP_TEMPLATETAGS_LAZY_MAX_AGE=10):
+            self.assertEqual(node.get_cache_timeout(Context()), 10)
+        with self.settings(BOOTSTRAP_TEMPLATETAGS_LAZY_MAX_AGE=None):
+            self.assertEqual(node.get_cache_timeout(Context()), 300)
+
+    def test_unnamed_template_renders_eagerly(self):
+        source = LAZY_TEMPLATES[0]["OPTIONS"]["loaders"][0][1]["lazy_accordion.html"]
+        rendered = Template(source).render(Context({"name": "Eager", "counter": "called"}))
+        self.assertIn("Second Eager called", rendered)
+        self.assertNotIn("bootstrap-lazy", rendered)
+
+    def test_navtabs_only_active_tab_rendered(self):
+        rendered, calls = self.render("lazy_navtabs.html", name="Lazy")
+        self.assertEqual(calls, 0)
+        self.assertIn("Second Lazy", rendered)
+        self.assertIn("Third Lazy", rendered)
+        self.assertNotIn("First Lazy", rendered)
+        self.assertNotIn("Fourth Lazy", rendered)
+        self.assertIn('<div class="tab-pane " id="first"><div class="bootstrap-lazy"', rendered)
+
+        urls = re.findall(r'data-url="([^"]+)"', rendered)
+        self.assertEqual(len(urls), 2)
+        self.assertEqual(self.client.get(urls[0]).content.decode().strip(), "First Lazy")
+        self.assertEqual(self.client.get(urls[1]).content.decode().strip(), "Fourth Lazy")
+
+
+class InstrumentationTest(SimpleTestCase):
+    def test_collector(self):
+        template = Template(FragmentRegistryTest.template)
+        with TimingCollector() as collector:
+            template.render(Context())
+        template.render(Context())
+
+        records = {(record.kind, record.name): record for record in collector.summary()}
+        tag = records[("tag", "bootstrap_accordion")]
+        self.assertEqual(tag.count, 1)
+        self.assertEqual(records[("handler", "bootstrap_accordion")].count, 1)
+        self.assertEqual(records[("handler", "panel")].count, 2)
+        self.assertEqual(records[("fragment", "accordion/heading.html")].count, 2)
+        self.assertEqual(records[("fragment", "accordion/wrapper.html")].count, 1)
+
+        children = (
+            records[("handler", "bootstrap_accordion")].total
+            + records[("handler", "panel")].total
+            + records[("fragment", "accordion/wrapper.html")].total
+        )
+        self.assertAlmostEqual(tag.child, children)
+        self.assertLess(tag.self_time, tag.total)
+        self.assertFalse(instrumentation.render_timing.receivers)
+
+    def test_server_timing_middleware(self):
+        template = Template(FragmentRegistryTest.template)
+        middleware = instrumentation.ServerTimingMiddleware(
+            lambda request: HttpResponse(template.render(Context()))
+        )
+        response = middleware(RequestFactory().get("/"))
+        header = response["Server-Timing"]
+        self.assertIn("bt-tag-bootstrap_accordion;dur=", header)
+        self.assertIn("bt-fragment-accordion-heading.html;dur=", header)
+        self.assertIn('desc="2x, self ', header)
+
+
+class RuntimeStyleTest(SimpleTestCase):
+    template = """
+        {% load bootstrap_tags %}
+        {% bootstrap_accordion id="my_accordion" %}
+            {% panel heading="First heading" %}
+                {% bootstrap_navtabs style_version="bootstrap2" %}
+                    {% tab label="First" %}First
+                {% endbootstrap_navtabs %}
+        {% endbootstrap_accordion %}
+        """
+
+    def test_style_from_context(self):
+        template = Template(self.template)
+        bootstrap2 = template.render(Context({"bootstrap_style": "bootstrap2"}))
+        self.assertIn('<div class="accordion" id="my_accordion">', bootstrap2)
+        bootstrap3 = template.render(Context())
+        self.assertIn('<div class="panel-group" id="my_accordion">', bootstrap3)
+
+    def test_style_version_argument(self):
+        rendered = Template(self.template).render(Context({"bootstrap_style": "bootstrap3"}))
+        self.assertIn('<div class="panel-group" id="my_accordion">', rendered)
+        # bootstrap2's tab.html has no data attributes
+        self.assertIn('<a data-toggle="tab" href="#first">First</a>', rendered)
+
+    def test_switching_styles_reuses_fragments(self):
+        fragments.clear()
+        template = Template(self.template)
+        template.render(Context({"bootstrap_style": "bootstrap2"}))
+        template.render(Context({"bootstrap_style": "bootstrap3"}))
+        misses = fragments.misses
+        template.render(Context({"bootstrap_style": "bootstrap2"}))
+        template.render(Context({"bootstrap_style": "bootstrap3"}))
+        self.assertEqual(fragments.misses, misses)
+
+    def test_unsupported_use_checked_against_rendered_style(self):
+        template = Template(
+            """
+            {% load bootstrap_tags %}
+            {% bootstrap_accordion id="my_accordion" style="primary" %}
+            {% endbootstrap_accordion %}
+            """
+        )
+        template.render(Context())
+        with self.assertRaises(ValueError):
+            template.render(Context({"bootstrap_style": "bootstrap2"}))
+
+    @override_settings(BOOTSTRAP_TEMPLATETAGS_STYLE=None)
+    def test_missing_setting(self):
+        template = Template(self.template)
+        with self.assertRaises(ImproperlyConfigured):
+            template.render(Context())
+        self.assertIn(
+            'class="accordion"', template.render(Context({"bootstrap_style": "bootstrap2"}))
+        )
+
+
+class DataDrivenTagsTest(SimpleTestCase):
+    items = [
+        {"name": "First", "answer": "One & only", "slug": "one"},
+        {"name": "Second", "answer": "Two", "slug": "two"},
+    ]
+
+    def test_accordion_from_matches_panels(self):
+        expected = Template(
+            """{% load bootstrap_tags %}{% bootstrap_accordion id="faq" active_panel=2 %}"""
+            """{% panel heading="First" %}<p>One &amp; only</p>"""
+            """{% panel heading="Second" %}<p>Two</p>{% endbootstrap_accordion %}"""
+        ).render(Context())
+        template = Template(
+            """{% load bootstrap_tags %}{% bootstrap_accordion_from items id="faq" """
+            """heading_attr="name" body_template=body item_name="entry" active_panel=2 %}"""
+        )
+        body = Template("<p>{{ entry.answer }}</p>")
+        context = {"items": iter(self.items), "body": body}
+        self.assertEqual(template.render(Context(context)), expected)
+
+        rendered = render_accordion_from(
+            (item for item in self.items),
+            "faq",
+            heading_attr="name",
+            body_template=Template("<p>{{ item.answer }}</p>"),
+            active_panel=2,
+        )
+        self.assertEqual(rendered, expected)
+
+    def test_body_template_compiled_once(self):
+        body = Template("<p>{{ item.answer }}</p>")
+        template = Template(
+            """{% load bootstrap_tags %}"""
+            """{% bootstrap_accordion_from items id="faq" heading_attr="name" body_template=body %}"""
+        )
+        with mock.patch("bootstrap_templatetags.components.get_template") as get:
+            get.return_value = body
+            template.render(Context({"items": self.items, "body": "faq/answer.html"}))
+        get.assert_called_once_with("faq/answer.html")
+
+    def test_navtabs_from(self):
+        template = Template(
+            """{% load bootstrap_tags %}{% bootstrap_navtabs_from items label_attr="name" """
+            """body_attr="answer" id_attr="slug" %}"""
+        )
+        rendered = template.render(Context({"items": self.items}))
+        self.assertIn(
+            '<li class="active"><a data-toggle="tab" href="#one">First</a></li>', rendered
+        )
+        self.assertIn('<div class="tab-pane " id="two">Two</div>', rendered)
+        self.assertIn("One &amp; only", rendered)
+        self.assertEqual(
+            render_navtabs_from(self.items, label_attr="name", body_attr="answer", id_attr="slug"),
+            rendered,
+        )
+
+    def test_python_api_style(self):
+        rendered = render_accordion_from(
+            self.items, "faq", heading_attr="name", body_attr="answer", style_version="bootstrap2"
+        )
+        self.assertIn('<div class="accordion" id="faq">', rendered)
+
+    def test_style_templates(self):
+        style_templates = {
+            "bootstrap3": dict(Accordion.templates, wrapper="navtabs/panels_wrapper.html")
+        }
+        template = Template(
+            """{% load bootstrap_tags %}"""
+            """{% bootstrap_accordion_from items id="faq" heading_attr="name" body_attr="answer" %}"""
+        )
+        with mock.patch.object(BootstrapAccordionFrom.spec, "style_templates", style_templates):
+            rendered = template.render(
+                Context({"items": self.items, "bootstrap_style": "bootstrap3"})
+            )
+        self.assertTrue(rendered.startswith('<div class="tab-content">'))
+
+
+class ComponentsTest(SimpleTestCase):
+    def test_accordion_matches_tag(self):
+        expected = Template(
+            """{% load bootstrap_tags %}{% bootstrap_accordion id="acc" style="info" %}"""
+            """{% panel heading="One" %}<b>1</b>{% panel heading="Two" style="danger" %}2 &amp; 3"""
+            """{% endbootstrap_accordion %}"""
+        ).render(Context())
+        accordion = Accordion(id="acc", style="info")
+        accordion.panel("One", mark_safe("<b>1</b>")).panel("Two", "2 & 3", style="danger")
+        self.assertEqual(accordion.render(), expected)
+        self.assertEqual(str(accordion), expected)
+
+    def test_navtabs_matches_tag(self):
+        template = Template(
+            """{% load bootstrap_tags %}{% bootstrap_navtabs active_tab=2 %}"""
+            """{% tab label="One" %}1{% tab label="Two" show=False %}2"""
+            """{% tab label="Three" id="third" %}<i>3</i>{% endbootstrap_navtabs %}"""
+        )
+        navtabs = NavTabs(active_tab=2, style_version="bootstrap2")
+        navtabs.tab("One", "1").tab("Two", "2", show=False)
+        navtabs.tab("Three", mark_safe("<i>3</i>"), id="third")
+        expected = template.render(Context({"bootstrap_style": "bootstrap2"}))
+        self.assertEqual(navtabs.render(), expected)
+        self.assertIn('<li class="active"><a data-toggle="tab" href="#third">', expected)
+
+    def test_data_attrs(self):
+        rendered = NavTabs().tab("One", "1", data_toggle_id="x").render()
+        self.assertIn('data-toggle-id="x"', rendered)
+
+    def test_unsupported_options(self):
+        with self.assertRaises(ValueError):
+            Accordion(id="acc", style="info", style_version="bootstrap2")
+        accordion = Accordion(id="acc", style_version="bootstrap2")
+        with self.assertRaises(ValueError):
+            accordion.panel("One", "1", style="info")
+
+
+class SegmentsTest(SimpleTestCase):
+    template = """{% load bootstrap_tags %}
+        {% bootstrap_accordion id="outer" %}
+            {% panel heading="Outer" %}
+                {% bootstrap_navtabs %}
+                    {% tab label="Tab" %}
+                        {% if True %}
+                            {% bootstrap_accordion id="inner" %}{% panel heading="In" %}{{ text }}
+                            {% endbootstrap_accordion %}
+                        {% endif %}
+                        {% bootstrap_accordion id="sibling" %}{% panel heading="Sib" %}{{ text }}
+                        {% endbootstrap_accordion %}
+                {% endbootstrap_navtabs %}
+        {% endbootstrap_accordion %}"""
+
+    def test_nested_output_joined_once(self):
+        template = Template(self.template)
+        context = Context({"text": "<b>"})
+        expected = template.render(context)
+        self.assertEqual(expected.count("&lt;b&gt;"), 2)
+        self.assertIn('id="inner"', expected)
+
+        with mock.patch.object(
+            Segments, "flatten", autospec=True, side_effect=Segments.flatten
+        ) as flatten:
+            self.assertEqual(template.render(context), expected)
+        # Once for the outer accordion, once for the accordion rendered inside {% if %}
+        self.assertEqual(flatten.call_count, 2)
+
+    def test_builders_keep_segments(self):
+        inner = Accordion(id="inner").panel("In", "<b>").render_segments()
+        outer = Accordion(id="outer").panel("Out", inner)
+        self.assertIsInstance(outer.render_segments(), Segments)
+        self.assertIn("&lt;b&gt;", outer.render())
+        self.assertIn("&lt;b&gt;", str(NavTabs().tab("Tab", inner)))
+
+
+JINJA_MATRIX = {
+    "accordion": """{% bootstrap_accordion id="faq" active_panel=2 %}
+        {% panel heading="One & two" %}<b>{{ text }}</b>
+        {% panel heading=title %}Second
+        {% panel heading="Third" %}{% if text %}{{ text }}{% endif %}
+    {% endbootstrap_accordion %}""",
+    "navtabs": """{% bootstrap_navtabs active_tab=2 %}
+        {% tab label="One" %}1
+        {% tab label="Two" show=False %}2
+        {% tab label=title id="third" %}{{ text }}
+    {% endbootstrap_navtabs %}""",
+    "nested": """{% bootstrap_accordion id="outer" %}{% panel heading="Outer" %}
+        {% bootstrap_navtabs %}{% tab label="Tab" %}
+            {% bootstrap_accordion id="inner" style_version=inner_style %}
+                {% panel heading="Inner" %}{{ text }}
+            {% endbootstrap_accordion %}
+        {% endbootstrap_navtabs %}
+    {% endbootstrap_accordion %}""",
+    "positional": """{% bootstrap_accordion "faq" 3 %}{% panel "Only" %}Body{% endbootstrap_accordion %}""",
+}
+
+
+@skipIf(jinja2 is None, "Jinja2 is not installed")
+class JinjaExtensionTest(SimpleTestCase):
+    def setUp(self):
+        from bootstrap_templatetags.jinja import AccordionExtension, NavTabsExtension
+
+        self.environment = jinja2.Environment(
+            extensions=[AccordionExtension, NavTabsExtension], autoescape=True
+        )
+
+    def test_matches_django_tags(self):
+        for style in styles.names():
+            context = {
+                "text": "<i>",
+                "title": "Title & co",
+                "bootstrap_style": style,
+                "inner_style": "bootstrap3",
+            }
+            for name, source in JINJA_MATRIX.items():
+                with self.subTest(style=style, template=name):
+                    expected = Template("{% load bootstrap_tags %}" + source).render(
+                        Context(context)
+                    )
+                    rendered = self.environment.from_string(source).render(context)
+                    self.assertEqual(rendered, expected)
+
+    def test_fragments_compiled_once_per_style(self):
+        from bootstrap_templatetags.jinja import AccordionExtension
+
+        template = self.environment.from_string(JINJA_MATRIX["accordion"])
+        compile = mock.patch.object(
+            AccordionExtension,
+            "compile_fragment",
+            autospec=True,
+            side_effect=lambda extension, fragment: jinja2.Template(""),
+        )
+        with compile as compile_fragment:
+            for style in ["bootstrap2", "bootstrap3"] * 5:
+                template.render(bootstrap_style=style)
+        self.assertEqual(compile_fragment.call_count, 8)
+
+    def test_unsupported_use(self):
+        template = self.environment.from_string(
+            """{% bootstrap_accordion id="faq", style="info" %}{% panel heading="One" %}1"""
+            """{% endbootstrap_accordion %}"""
+        )
+        with self.assertRaises(ValueError):
+            template.render(bootstrap_style="bootstrap2")
+        self.assertIn("panel-info", template.render(bootstrap_style="bootstrap3"))
+
+    def test_argument_errors(self):
+        sources = [
+            "{% bootstrap_accordion %}{% endbootstrap_accordion %}",
+            "{% bootstrap_accordion id='faq' lazy=True %}{% endbootstrap_accordion %}",
+            "{% bootstrap_accordion id='faq' colour='red' %}{% endbootstrap_accordion %}",
+            "{% bootstrap_navtabs %}{% tab %}{% endbootstrap_navtabs %}",
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                with self.assertRaises(jinja2.TemplateSyntaxError):
+                    self.environment.from_string(source)
+
+
+class CompileTimeTest(SimpleTestCase):
+    static = """{% load bootstrap_tags %}
+        {% bootstrap_accordion id="faq" active_panel=2 %}
+            {% panel heading="One" %}First
+            {% panel heading="Two" %}
+                {% bootstrap_navtabs %}{% tab label="A" show=False %}a{% tab label="B" %}b
+                {% endbootstrap_navtabs %}
+        {% endbootstrap_accordion %}"""
+
+    def get_node(self, template):
+        return template.nodelist.get_nodes_by_type(EasyTag)[0]
+
+    def test_static_tag_notices_edited_fragment(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bootstrap3", "accordion", "wrapper.html")
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write("V1{{ content }}")
+            templates = [
+                {
+                    "BACKEND": "django.template.backends.django.DjangoTemplates",
+                    "DIRS": [directory],
+                    "APP_DIRS": True,
+                }
+            ]
+            with self.settings(TEMPLATES=templates, DEBUG=True):
+                template = Template(
+                    '{% load bootstrap_tags %}{% bootstrap_accordion id="s" %}'
+                    '{% panel heading="One" %}1{% endbootstrap_accordion %}'
+                )
+                self.assertTrue(self.get_node(template).static)
+                self.assertTrue(template.render(Context()).startswith("V1"))
+
+                fragment = fragments.get("bootstrap3", "accordion/wrapper.html")
+                with open(path, "w") as f:
+                    f.write("V2{{ content }}")
+                os.utime(path, ns=(fragment.mtime + 10**9, fragment.mtime + 10**9))
+                self.assertTrue(template.render(Context()).startswith("V2"))
+
+    def test_literal_errors_raised_at_compile_time(self):
+        sources = [
+            '{% bootstrap_accordion id="a" use_title="title" %}{% endbootstrap_accordion %}',
+            '{% bootstrap_accordion id="a" use_title=True %}{% endbootstrap_accordion %}',
+            '{% bootstrap_accordion id="a" style="info" style_version="bootstrap2" %}'
+            "{% endbootstrap_accordion %}",
+            '{% bootstrap_accordion id="a" style_version="bootstrap2" %}'
+            '{% panel heading="x" style="info" %}{% endbootstrap_accordion %}',
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                with self.assertRaises(TemplateSyntaxError):
+                    Template("{% load bootstrap_tags %}" + source)
+
+    def test_style_checked_at_render_time_when_unknown(self):
+        template = Template(
+            '{% load bootstrap_tags %}{% bootstrap_accordion id="a" style="info" use_title="h4" %}'
+            '{% panel heading="x" %}{% endbootstrap_accordion %}'
+        )
+        self.assertIn("panel-info", template.render(Context()))
+        with self.assertRaises(ValueError):
+            template.render(Context({"bootstrap_style": "bootstrap2"}))
+
+    def test_literal_arguments(self):
+        template = Template(self.static)
+        opening, _ = self.get_node(template).nodelists[0]
+        self.assertEqual(opening.constants["id"], "faq")
+        self.assertEqual(opening.constants["active_panel"], 2)
+        self.assertEqual(opening.variables, ())
+        navtabs = template.nodelist.get_nodes_by_type(BootstrapNavTabs)[0]
+        self.assertEqual(navtabs.nodelists[1][0].constants["label"], "A")
+        self.assertEqual(navtabs.nodelists[1][0].constants["show"], False)
+
+    def test_static_output_folded(self):
+        template = Template(self.static)
+        self.assertTrue(self.get_node(template).static)
+        expected = Template(self.static.replace('"Two"', "two")).render(Context({"two": "Two"}))
+
+        self.assertEqual(template.render(Context()), expected)
+        with mock.patch("bootstrap_templatetags.components.render_fragment") as render:
+            self.assertEqual(template.render(Context()), expected)
+        render.assert_not_called()
+
+        bootstrap2 = template.render(Context({"bootstrap_style": "bootstrap2"}))
+        self.assertIn('<div class="accordion" id="faq">', bootstrap2)
+
+        fragments.clear()
+        with mock.patch("bootstrap_templatetags.components.render_fragment") as render:
+            render.return_value = ""
+            template.render(Context())
+        render.assert_called()
+
+    def test_dynamic_tags_not_folded(self):
+        sources = [
+            '{% bootstrap_accordion id="a" %}{% panel heading="x" %}{{ body }}'
+            "{% endbootstrap_accordion %}",
+            '{% bootstrap_accordion id="a" %}{% panel heading=x %}{% endbootstrap_accordion %}',
+            '{% bootstrap_navtabs lazy=True %}{% tab label="x" %}{% endbootstrap_navtabs %}',
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                template = Template("{% load bootstrap_tags %}" + source)
+                self.assertFalse(self.get_node(template).static)
+
+
+class NamedValue(object):
+    def __init__(self, name, pk):
+        self.name = name
+        self.pk = pk
+
+    def __str__(self):
+        return self.name
+
+
+class SlowValue(object):
+    """Stands in for a lazily evaluated queryset: reading ``value`` blocks for ``delay`` seconds."""
+
+    def __init__(self, value, delay=0.2):
+        self._value = value
+        self.delay = delay
+        self.threads = set()
+
+    @property
+    def value(self):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return self._value
+
+
+class AsyncRenderTest(SimpleTestCase):
+    template = """{% load bootstrap_tags %}<h1>{{ title }}</h1>
+        {% bootstrap_accordion id="slow" active_panel=2 %}
+            {% panel heading="One" %}{{ one.value }}{% url "admin:index" as home %}{{ home }}
+            {% panel heading=title %}{{ two.value }}
+            {% panel heading="Three" %}{{ three.value }}
+        {% endbootstrap_accordion %}
+        {% bootstrap_navtabs active_tab=2 %}
+            {% tab label="Hidden" show=False %}{{ one.value }}
+            {% tab label="A" %}{{ two.value }}
+            {% tab label="B" %}{{ three.value }}
+        {% endbootstrap_navtabs %}"""
+
+    def get_context(self, delay):
+        return {
+            "title": "Slow & steady",
+            "one": SlowValue("first", delay),
+            "two": SlowValue("<second>", delay),
+            "three": SlowValue("third", delay),
+        }
+
+    async def test_matches_sync_render(self):
+        template = Template(self.template)
+        expected = await sync_to_async(template.render)(Context(self.get_context(0)))
+        self.assertEqual(await arender_template(template, self.get_context(0)), expected)
+
+    async def test_bodies_overlap(self):
+        template = Template(self.template)
+        context = self.get_context(0.2)
+        start = time.monotonic()
+        await arender_template(template, context)
+        # Two tags of three bodies each, sleeping 0.2s apiece: 1.2s if serialized
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertGreater(len(context["three"].threads), 0)
+
+    async def test_cached_and_static_tags(self):
+        template = Template(
+            """{% load bootstrap_tags %}{% bootstrap_accordion id="s" %}"""
+            """{% panel heading="x" %}static{% endbootstrap_accordion %}"""
+        )
+        node = template.nodelist.get_nodes_by_type(EasyTag)[0]
+        rendered = await node.arender(Context())
+        self.assertIn("static", rendered)
+        self.assertEqual(rendered, await sync_to_async(template.render)(Context()))
+
+
+class ParallelRenderTest(SimpleTestCase):
+    template = """{% load bootstrap_tags i18n %}
+        {% bootstrap_accordion id="slow" active_panel=2 parallel=3 %}
+            {% panel heading="One" %}{{ one.value }}{% url "admin:index" as home %}{{ home }}
+            {% panel heading=title %}{{ two.value }}
+            {% panel heading="Three" %}{% get_current_language as lang %}{{ three.value }}{{ lang }}
+        {% endbootstrap_accordion %}
+        {% bootstrap_navtabs active_tab=2 parallel=3 %}
+            {% tab label="Hidden" show=False %}{{ one.value }}
+            {% tab label="A" %}{{ two.value }}
+            {% tab label="B" %}{{ three.value }}
+        {% endbootstrap_navtabs %}"""
+
+    def get_context(self, delay):
+        return {
+            "title": "Slow & steady",
+            "one": SlowValue("first", delay),
+            "two": SlowValue("<second>", delay),
+            "three": SlowValue("third", delay),
+        }
+
+    def test_matches_sequential_render(self):
+        expected = Template(self.template.replace(" parallel=3", "")).render(
+            Context(self.get_context(0))
+        )
+        self.assertEqual(Template(self.template).render(Context(self.get_context(0))), expected)
+        self.assertIn('<div id="slow-panel-2" class="panel-collapse collapse in">', expected)
+
+    def test_workers_coerced(self):
+        template = Template(
+            '{% load bootstrap_tags %}{% bootstrap_accordion id="a" parallel=n %}'
+            '{% panel heading="One" %}1{% panel heading="Two" %}2{% endbootstrap_accordion %}'
+        )
+        expected = template.render(Context({"n": 0}))
+        self.assertEqual(template.render(Context({"n": "4"})), expected)
+        for value in ["many", -1]:
+            with self.subTest(value=value):
+                with self.assertRaises(TemplateSyntaxError):
+                    template.render(Context({"n": value}))
+
+    def test_bodies_do_not_share_variables(self):
+        template = Template(
+            """{% load bootstrap_tags %}{% bootstrap_accordion id="a" parallel=2 %}"""
+            """{% panel heading="a" %}{% url "admin:index" as home %}{{ home }}"""
+            """{% panel heading="b" %}[{{ home }}]{% endbootstrap_accordion %}[{{ home }}]"""
+        )
+        rendered = template.render(Context())
+        self.assertIn("/admin/", rendered)
+        self.assertEqual(rendered.count("[]"), 2)
+
+    def test_bodies_overlap(self):
+        context = self.get_context(0.2)
+        start = time.monotonic()
+        Template(self.template).render(Context(context))
+        # Two tags of three bodies each, sleeping 0.2s apiece: 1.2s if serialized
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertNotIn(threading.get_ident(), context["three"].threads)
+
+    def test_language_is_carried_to_workers(self):
+        with translation.override("fr"):
+            rendered = Template(self.template).render(Context(self.get_context(0)))
+        self.assertIn("thirdfr", rendered)
+
+    def test_nested_tags_render_sequentially_in_workers(self):
+        template = Template(
+            """{% load bootstrap_tags %}{% bootstrap_accordion id="outer" parallel=2 %}"""
+            """{% panel heading="a" %}{% bootstrap_accordion id="inner" parallel=2 %}"""
+            """{% panel heading="b" %}{{ one.value }}{% endbootstrap_accordion %}"""
+            """{% panel heading="c" %}{{ two.value }}{% endbootstrap_accordion %}"""
+        )
+        rendered = template.render(Context(self.get_context(0)))
+        self.assertIn("first", rendered)
+        self.assertIn("&lt;second&gt;", rendered)
+
+
+class WarmupTest(SimpleTestCase):
+    sources = {
+        "page.html": '{% load i18n bootstrap_tags %}{% bootstrap_accordion id="a" %}'
+        '{% panel heading="x" %}{{ x }}{% endbootstrap_accordion %}',
+        "broken.html": "{% load bootstrap_tags %}{% bootstrap_accordion %}{% endbootstrap_accordion %}",
+        "plain.html": "{{ x }}",
+    }
+
+    def get_templates(self):
+        loaders = [
+            ("django.template.loaders.locmem.Loader", self.sources),
+            "django.template.loaders.filesystem.Loader",
+        ]
+        return [
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "DIRS": [native.TEMPLATES_DIR],
+                "OPTIONS": {"loaders": [("django.template.loaders.cached.Loader", loaders)]},
+            }
+        ]
+
+    def test_command_compiles_fragments_and_templates(self):
+        stdout = StringIO()
+        with self.settings(TEMPLATES=self.get_templates()):
+            call_command("bootstrap_tags_warmup", stdout=stdout, stderr=StringIO())
+            fragment_names = get_fragment_names("bootstrap3")
+            self.assertIn("modal/wrapper.html", fragment_names)
+            self.assertEqual(fragments.stats()["size"], len(fragment_names))
+            loader = engines["django"].engine.template_loaders[0]
+            self.assertIn("page.html", loader.get_template_cache)
+            self.assertNotIn("plain.html", loader.get_template_cache)
+        output = stdout.getvalue()
+        self.assertRegex(output, r"ms  bootstrap3/accordion/wrapper\.html")
+        self.assertRegex(output, r"ms  page\.html")
+        self.assertIn("Compiled %d templates" % (len(fragment_names) + 1), output)
+
+    def test_fail_on_error(self):
+        stderr = StringIO()
+        with self.settings(TEMPLATES=self.get_templates()):
+            with self.assertRaisesMessage(CommandError, "1 templates failed to compile"):
+                call_command(
+                    "bootstrap_tags_warmup", "--fail-on-error", stdout=StringIO(), stderr=stderr
+                )
+        self.assertIn("broken.html", stderr.getvalue())
+
+    def test_ready_hook(self):
+        config = apps.get_app_config("bootstrap_templatetags")
+        with mock.patch("bootstrap_templatetags.warmup.warmup") as warmup:
+            config.ready()
+            warmup.assert_not_called()
+            with self.settings(BOOTSTRAP_TEMPLATETAGS_WARMUP=True):
+                config.ready()
+            warmup.assert_called_once_with()
+
+
+class CompactStateTest(SimpleTestCase):
+    def traced(self, function):
+        """Returns the memory still allocated by what ``function`` returns, and its result."""
+        tracemalloc.start()
+        try:
+            result = function()
+            return tracemalloc.get_traced_memory()[0], result
+        finally:
+            tracemalloc.stop()
+
+    def test_compiled_nodes(self):
+        source = (
+            '{% load bootstrap_tags %}{% bootstrap_accordion id="a" %}'
+            '{% panel heading="x" %}{{ x }}{% endbootstrap_accordion %}'
+        )
+        Template(source)
+        size, templates = self.traced(lambda: [Template(source) for _ in range(100)])
+        nodes = [template.nodelist.get_nodes_by_type(EasyTag)[0] for template in templates]
+        self.assertEqual(sorted(vars(nodes[0])), ["nodelists", "options", "origin", "token"])
+        self.assertIs(nodes[0].options, nodes[1].options)
+        self.assertIs(nodes[0].nodelists[1][0], nodes[1].nodelists[1][0])
+        # The whole template, with its text and variable nodes, in a few KiB
+        self.assertLess(size / len(templates), 4096)
+
+    def test_render_records(self):
+        self.assertFalse(hasattr(NavTabs().tab("A", "a").tabs[0], "__dict__"))
+        size, tabs = self.traced(lambda: [Tab("a", "", True, None) for _ in range(1000)])
+        dict_size, dicts = self.traced(
+            lambda: [{"tab_id": "a", "active": "", "show": True, "body": None} for _ in range(1000)]
+        )
+        self.assertLess(size, dict_size / 2)
+
+        template = Template(
+            "{% load bootstrap_tags %}{% bootstrap_navtabs %}"
+            + '{% tab label="T" %}{{ x }}' * 200
+            + "{% endbootstrap_navtabs %}"
+        )
+        node = template.nodelist.get_nodes_by_type(BootstrapNavTabs)[0]
+        context = Context({"x": 1})
+
+        def render_strip():
+            node.bootstrap_navtabs(context, node.nodelists[0][1], 1, False, None)
+            return [binding(node, context, nodelist) for binding, nodelist in node.nodelists[1:]]
+
+        with context.render_context.push_state(template):
+            size, _strip = self.traced(render_strip)
+            self.assertIsInstance(context.render_context[node], RenderState)
+        # Each tab's record, body callable and strip markup until the panels are rendered
+        self.assertLess(size / 200, 1024)
+
+
+class TagSpecTest(SimpleTestCase):
+    class Wrapped(BaseBootstrapTag):
+        spec = TagSpec(
+            "wrapped",
+            arguments=[Argument("id"), Argument("level", 1, types=int)],
+            sections=[Section("part", [Argument("title", "")], varkw="extra")],
+            templates={"wrapper": "accordion/wrapper.html"},
+            style_templates={"bootstrap2": {"wrapper": "navtabs/panels_wrapper.html"}},
+        )
+
+        def render_segments(self, context):
+            content = super().render_segments(context).flatten()
+            style = self.get_style(context)
+            return Segments([self.render_template("wrapper", style, id="w", content=content)])
+
+        def wrapped(self, context, nodelist, id, level):
+            return "%s:%s[%s]" % (id, level, nodelist.render(context))
+
+        def part(self, context, nodelist, title, **extra):
+            extra = ",".join("%s=%s" % item for item in sorted(extra.items()))
+            return "%s(%s)[%s]" % (title, extra, nodelist.render(context))
+
+    def render(self, source, **context):
+        library = Library()
+        self.Wrapped.register_tag(library)
+        engine = Engine()
+        engine.template_builtins.append(library)
+        return engine.from_string(source).render(Context(context))
+
+    def test_renamed_subclass(self):
+        class MyAccordion(BootstrapAccordion):
+            name = "my_accordion"
+            my_accordion = BootstrapAccordion.bootstrap_accordion
+
+        self.assertEqual(MyAccordion.spec.name, "my_accordion")
+        self.assertEqual(MyAccordion.spec.intermediate_tags, BootstrapAccordion.intermediate_tags)
+        library = Library()
+        MyAccordion.register_tag(library)
+        engine = Engine()
+        engine.template_builtins.append(library)
+        rendered = engine.from_string(
+            '{% my_accordion id="faq" %}{% panel heading="One" %}1{% endmy_accordion %}'
+        ).render(Context({"bootstrap_style": "bootstrap3"}))
+        self.assertIn('<div class="panel-group" id="faq">', rendered)
+        self.assertEqual(BootstrapAccordion.spec.name, "bootstrap_accordion")
+
+    def test_declared_tag(self):
+        self.assertEqual(self.Wrapped.name, "wrapped")
+        self.assertEqual(self.Wrapped.intermediate_tags, ("part",))
+        self.assertEqual(self.Wrapped.handler_specs["part"].varkw, "extra")
+        source = '{% wrapped "w" %}a{% part title=t x=1 %}b{% endwrapped %}'
+        rendered = self.render(source, t="T")
+        self.assertInHTML('<div class="panel-group" id="w">w:1[a]T(x=1)[b]</div>', rendered)
+        rendered = self.render(source, t="T", bootstrap_style="bootstrap2")
+        self.assertInHTML('<div class="tab-content">w:1[a]T(x=1)[b]</div>', rendered)
+
+    def test_ported_tags(self):
+        self.assertEqual(BootstrapAccordion.intermediate_tags, ("group", "panel"))
+        self.assertIsInstance(BootstrapNavTabs.handler_specs["tab"], Section)
+        self.assertIsNone(BootstrapAccordionFrom.end_tag)
+        self.assertEqual(BootstrapAccordionFrom.templates, Accordion.templates)
+
+    def test_argument_errors(self):
+        errors = [
+            ('{% wrapped id="w" level="2" %}', "'wrapped' argument 'level' must be int, not '2'"),
+            ("{% wrapped %}", "'wrapped' did not receive value(s) for the argument(s): 'id'"),
+            ('{% wrapped id="w" size=2 %}', "'wrapped' received unexpected keyword argument"),
+            ('{% wrapped id="w" 2 %}', "'wrapped' received some positional argument(s) after"),
+            ('{% wrapped "w" 1 2 %}', "'wrapped' received too many positional arguments"),
+            ('{% wrapped "w" id="v" %}', "'wrapped' received multiple values for keyword"),
+        ]
+        for source, message in errors:
+            with self.subTest(source=source):
+                with self.assertRaisesMessage(TemplateSyntaxError, message):
+                    self.render(source + "{% endwrapped %}")
+        # Flags accept any true-ish value, as before they were declared
+        rendered = Template(
+            '{% load bootstrap_tags %}{% bootstrap_navtabs %}{% tab "A" %}a'
+            '{% tab "B" active=1 %}b{% tab "C" show=0 %}c{% endbootstrap_navtabs %}'
+        ).render(Context({"bootstrap_style": "bootstrap3"}))
+        self.assertIn('<div class="tab-pane active" id="b">b</div>', rendered)
+        self.assertNotIn('id="c"', rendered)
+        self.assertIn("w:None", self.render('{% wrapped "w" None %}{% endwrapped %}'))
+        with self.assertRaisesMessage(ValueError, "required argument 'b' follows optional ones"):
+            Section("bad", [Argument("a", 1), Argument("b")])
+
+
+class MoreComponentsTest(SimpleTestCase):
+    template = """{% load bootstrap_tags %}
+        {% bootstrap_modal id="confirm" title="Delete?" size=size %}Delete {{ name }}?
+        {% footer %}<button class="btn">OK</button>
+        {% endbootstrap_modal %}
+        {% bootstrap_carousel id="photos" active_slide=2 interval=3000 %}
+            {% slide caption="First" %}<img src="1.png">
+            {% slide %}<img src="2.png">
+        {% endbootstrap_carousel %}
+        {% bootstrap_dropdown label="Actions" id="actions" %}
+            {% header %}Edit
+            {% item href="/rename" %}Rename
+            {% divider %}
+            {% item href="/delete" disabled=True %}Delete {{ name }}
+        {% endbootstrap_dropdown %}
+        {% bootstrap_listgroup %}
+            {% item href="/inbox" badge=count active=True %}Inbox
+            {% item %}Archive
+        {% endbootstrap_listgroup %}"""
+
+    def render(self, style, **context):
+        context.setdefault("size", "lg" if style == "bootstrap3" else None)
+        context = Context(dict(context, name="<b>", count=3, bootstrap_style=style))
+        return Template(self.template).render(context)
+
+    def test_bootstrap3(self):
+        rendered = self.render("bootstrap3")
+        self.assertInHTML('<div class="modal-body">Delete &lt;b&gt;?</div>', rendered)
+        self.assertIn('<div class="modal-dialog modal-lg">', rendered)
+        self.assertInHTML(
+            '<div class="modal-footer"><button class="btn">OK</button></div>', rendered
+        )
+        self.assertIn('data-slide-to="1" class="active"', rendered)
+        self.assertInHTML('<div class="item active"><img src="2.png"></div>', rendered)
+        self.assertInHTML('<li role="presentation" class="dropdown-header">Edit</li>', rendered)
+        self.assertInHTML(
+            '<li role="presentation" class="disabled"><a role="menuitem" tabindex="-1" '
+            'href="/delete">Delete &lt;b&gt;</a></li>',
+            rendered,
+        )
+        self.assertInHTML(
+            '<a href="/inbox" class="list-group-item active"><span class="badge">3</span>Inbox</a>',
+            rendered,
+        )
+
+    def test_bootstrap2(self):
+        rendered = self.render("bootstrap2")
+        self.assertIn('<div id="confirm" class="modal hide fade"', rendered)
+        self.assertIn('<a class="carousel-control left" href="#photos"', rendered)
+        self.assertInHTML('<li class="nav-header">Edit</li>', rendered)
+        self.assertInHTML(
+            '<li class="active"><a href="/inbox"><span class="badge pull-right">3</span>Inbox</a>'
+            "</li>",
+            rendered,
+        )
+        with self.assertRaisesMessage(ValueError, "'lg' option not available for bootstrap2"):
+            self.render("bootstrap2", size="lg")
+
+    def test_builders(self):
+        modal = Modal("m", title="T", style_version="bootstrap3").body("<x>").footer("f")
+        self.assertInHTML('<div class="modal-body">&lt;x&gt;</div>', modal.render())
+        dropdown = Dropdown("Menu", style_version="bootstrap3").item("A", "/a").divider()
+        self.assertEqual(dropdown.render().count("<li"), 2)
+        carousel = Carousel("c", indicators=False, controls=False, style_version="bootstrap2")
+        self.assertNotIn("carousel-indicators", carousel.slide("one").render())
+        listgroup = ListGroup(style_version="bootstrap3").item("ok", style="success")
+        self.assertIn("list-group-item-success", listgroup.render())
+        with self.assertRaises(ValueError):
+            ListGroup(style_version="bootstrap2").item("ok", style="success")
+
+    def test_static_tags_fold(self):
+        template = Template(
+            '{% load bootstrap_tags %}{% bootstrap_listgroup %}{% item href="/a" %}A'
+            "{% endbootstrap_listgroup %}"
+        )
+        node = template.nodelist.get_nodes_by_type(EasyTag)[0]
+        self.assertTrue(node.static)
+        self.assertEqual(template.render(Context()), template.render(Context()))
+
+
+class StylePackTest(SimpleTestCase):
+    template = """{% load bootstrap_tags %}
+        {% bootstrap_accordion id="faq" style="info" %}
+            {% panel heading="First" %}One
+            {% panel heading="Second" %}Two
+        {% endbootstrap_accordion %}
+        {% bootstrap_navtabs %}
+            {% tab label="Home" id="home" %}Home
+            {% tab label="More" id="more" %}More
+        {% endbootstrap_navtabs %}"""
+
+    def render(self, style):
+        context = Context({"size": "lg", "name": "<b>", "count": 3, "bootstrap_style": style})
+        return Template(self.template).render(context) + Template(
+            MoreComponentsTest.template
+        ).render(context)
+
+    def tearDown(self):
+        styles.unregister("plain")
+        fragments.clear()
+
+    def test_bootstrap4(self):
+        rendered = self.render("bootstrap4")
+        self.assertIn('<div class="card border-info">', rendered)
+        self.assertIn('class="collapse show" aria-labelledby="faq-heading-1"', rendered)
+        self.assertIn('<a class="nav-link active" data-toggle="tab" href="#home"', rendered)
+        self.assertIn('<div class="tab-pane fade show active" id="home"', rendered)
+        self.assertIn('<div class="modal-dialog modal-lg" role="document">', rendered)
+        self.assertInHTML('<div class="carousel-item active"><img src="2.png"></div>', rendered)
+        self.assertInHTML(
+            '<a class="dropdown-item disabled" href="/delete">Delete &lt;b&gt;</a>', rendered
+        )
+        self.assertIn('<span class="badge badge-primary badge-pill">3</span>', rendered)
+
+    def test_bootstrap5(self):
+        rendered = self.render("bootstrap5")
+        self.assertIn('<div class="accordion-item border-info">', rendered)
+        self.assertIn('data-bs-parent="#faq"', rendered)
+        self.assertIn(
+            '<button class="nav-link active" type="button" data-bs-toggle="tab"', rendered
+        )
+        self.assertIn('<button type="button" class="btn-close" data-bs-dismiss="modal"', rendered)
+        self.assertIn('aria-label="Slide 2"', rendered)
+        self.assertInHTML('<li><hr class="dropdown-divider"></li>', rendered)
+        self.assertIn('<span class="badge bg-primary rounded-pill">3</span>', rendered)
+
+    def test_all_fragments_resolve(self):
+        results = [result for result in warmup(styles="all") if "/" in result.name]
+        self.assertEqual([result.error for result in results if result.error], [])
+        for style in ("bootstrap4", "bootstrap5"):
+            self.assertIn("%s/modal/wrapper.html" % style, [result.name for result in results])
+
+    def test_capabilities(self):
+        styles.register(StylePack("plain", template_dir="bootstrap3"))
+        with self.assertRaisesMessage(ValueError, "'lg' option not available for plain"):
+            Modal("m", size="lg", style_version="plain")
+        styles.register(StylePack("plain", [MODAL_SIZE], template_dir="bootstrap3"))
+        self.assertIn("modal-lg", Modal("m", size="lg", style_version="plain").body("x").render())
+
+    def test_stop_unsupported_use_still_importable(self):
+        from bootstrap_templatetags.templatetags.bootstrap_tags import stop_unsupported_use
+
+        with self.assertRaisesMessage(ValueError, "'info' option not available for bootstrap2"):
+            stop_unsupported_use(
+                BootstrapAccordion, "bootstrap2", [("info", "default")], "bootstrap2"
+            )
+
+    def test_native_pack(self):
+        styles.register(
+            StylePack(
+                "plain",
+                template_dir="bootstrap3",
+                renderers={"listgroup/item.html": lambda context: "<p>%s</p>" % context["body"]},
+            )
+        )
+        listgroup = ListGroup(style_version="plain").item("<one>").item("two")
+        self.assertHTMLEqual(
+            listgroup.render(), '<div class="list-group"><p>&lt;one&gt;</p><p>two</p></div>'
+        )
+        self.assertIsNone(fragments.get("plain", "listgroup/item.html").template)
+
+    def test_unknown_style(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "registered styles are bootstrap2"):
+            Modal("m", style_version="bootstrap9")
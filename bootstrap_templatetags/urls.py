@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from django.urls import path
+
+from . import views
+
+app_name = "bootstrap_templatetags"
+
+urlpatterns = [
+    path("lazy/<str:token>/", views.lazy_fragment, name="lazy"),
+]
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from django.core import signing
+from django.http import Http404, HttpResponse
+from django.template.context import make_context
+from django.template.loader import get_template
+
+from . import lazy
+from .templatetags.easytag import EasyTag
+
+
+def lazy_fragment(request, token):
+    """Renders the deferred body of a lazy accordion panel or navtabs tab."""
+    try:
+        payload = lazy.load(token)
+    except signing.BadSignature:
+        raise Http404("Invalid or expired fragment token")
+
+    template = get_template(payload["t"])
+    node = lazy.locate(template.template, EasyTag, payload["l"])
+    if node is None:
+        raise Http404("Fragment not found")
+
+    context = make_context(payload["c"], request, autoescape=template.backend.engine.autoescape)
+    with context.render_context.push_state(template.template):
+        with context.bind_template(template.template):
+            content = node.render_section(context, payload["i"])
+    return HttpResponse(content)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Compiles the fragment templates and the project templates that load ``bootstrap_tags`` ahead of
+the first request, so that they are already held by the cached template loader::
+
+    python manage.py bootstrap_tags_warmup
+
+or, on every process start, ``settings.BOOTSTRAP_TEMPLATETAGS_WARMUP = True`` (or a list of the
+styles whose fragments to compile).
+"""
+import os
+import re
+import time
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+from .components import get_default_style
+from .fragments import fragments
+from .styles import styles as style_packs
+
+LOAD_PATTERN = re.compile(r"{%\s*load\s[^%]*\bbootstrap_tags\b")
+
+
+class WarmupResult(object):
+    __slots__ = ("name", "duration", "error")
+
+    def __init__(self, name, duration, error=None):
+        self.name = name
+        self.duration = duration
+        self.error = error
+
+
+def get_fragment_names(style):
+    """Returns the fragment template names used by the bootstrap tags for ``style``."""
+    from .templatetags.bootstrap_tags import BaseBootstrapTag
+
+    names = set()
+    tags = [BaseBootstrapTag]
+    while tags:
+        tag = tags.pop()
+        names.update(tag.get_templates(style).values())
+        tags.extend(tag.__subclasses__())
+    return sorted(names)
+
+
+def iter_loaders(loaders):
+    """Yields ``loaders`` and the loaders wrapped by them, e.g. by the cached loader."""
+    for loader in loaders:
+        yield loader
+        yield from iter_loaders(getattr(loader, "loaders", ()))
+
+
+def find_templates(engine):
+    """
+    Returns the names of the templates of the Django ``engine`` that load ``bootstrap_tags``, found
+    in the directories of its filesystem and app directories loaders and in its locmem loaders.
+    """
+    names = set()
+    for loader in iter_loaders(engine.template_loaders):
+        sources = getattr(loader, "templates_dict", None)
+        if sources is not None:
+            names.update(name for name, source in sources.items() if LOAD_PATTERN.search(source))
+        for directory in loader.get_dirs() if hasattr(loader, "get_dirs") else ():
+            for root, _dirs, files in os.walk(str(directory)):
+                for filename in files:
+                    path = os.path.join(root, filename)
+                    try:
+                        with open(path, encoding=engine.file_charset) as f:
+                            source = f.read()
+                    except (OSError, UnicodeDecodeError):
+                        continue
+                    if LOAD_PATTERN.search(source):
+                        names.add(os.path.relpath(path, str(directory)).replace(os.sep, "/"))
+    return sorted(names)
+
+
+def timed_compile(name, compile, fail_silently):
+    start = time.perf_counter()
+    try:
+        compile()
+    except (TemplateDoesNotExist, TemplateSyntaxError) as error:
+        if not fail_silently:
+            raise
+        return WarmupResult(name, time.perf_counter() - start, error)
+    return WarmupResult(name, time.perf_counter() - start)
+
+
+def warmup(styles=None, fail_silently=True):
+    """
+    Resolves every fragment template for ``styles`` (by default the configured style; "all" for
+    every registered style pack) into the fragment registry, then compiles every template that
+    loads ``bootstrap_tags`` with each Django template engine, which keeps it when it uses the
+    cached loader.  Returns a ``WarmupResult`` for each template, in order.  Unless
+    ``fail_silently``, a template that fails to compile raises its ``TemplateSyntaxError`` (or
+    ``TemplateDoesNotExist`` for a fragment); otherwise the error is recorded on its result.
+    """
+    if styles == "all":
+        styles = style_packs.names()
+    results = []
+    for style in styles or [get_default_style()]:
+        for name in get_fragment_names(style):
+            results.append(
+                timed_compile(
+                    "%s/%s" % (style, name), lambda: fragments.get(style, name), fail_silently
+                )
+            )
+
+    for backend in engines.all():
+        engine = getattr(backend, "engine", None)
+        if engine is None:
+            continue
+        for name in find_templates(engine):
+            results.append(timed_compile(name, lambda: engine.get_template(name), fail_silently))
+    return results
@@ -30,4 +30,7 @@ setup(
     install_requires=[
         "django>=3.2",
     ],
+    extras_require={
+        "jinja2": ["jinja2>=3.0"],
+    },
 )